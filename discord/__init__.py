@@ -17,7 +17,7 @@ __license__ = 'MIT'
 __copyright__ = 'Copyright 2015-2016 Rapptz'
 __version__ = '0.16.12'
 
-from .client import Client, AppInfo, ChannelPermissions
+from .client import Client, AppInfo, ChannelPermissions, BulkResult
 from .user import User
 from .game import Game
 from .emoji import Emoji
@@ -33,9 +33,16 @@ from .colour import Color, Colour
 from .invite import Invite
 from .object import Object
 from .reaction import Reaction
+from .raw_models import RawMessageDeleteEvent, RawBulkMessageDeleteEvent, RawMessageUpdateEvent, \
+                        RawReactionActionEvent, RawReactionClearEvent
+from .metrics import RequestInfo
+from .retry import RetryPolicy
+from .purge import PurgeProgress
+from .iterators import MemberRecord
 from . import utils, opus, compat
 from .voice_client import VoiceClient
-from .enums import ChannelType, ServerRegion, Status, MessageType, VerificationLevel
+from .voice_scheduler import VoiceScheduler, ScheduledPlayer
+from .enums import ChannelType, ServerRegion, Status, MessageType, VerificationLevel, RequestPriority
 from collections import namedtuple
 from .embeds import Embed
 
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-2016 Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import copy
+from collections import OrderedDict, namedtuple
+
+CacheStats = namedtuple('CacheStats', 'hits misses invalidations evictions size')
+
+_MISSING = object()
+
+class _Entry:
+    __slots__ = ['data', 'expires', 'path', 'url', 'guild_id']
+
+    def __init__(self, data, expires, route):
+        self.data = data
+        self.expires = expires
+        self.path = route.path
+        self.url = route.url
+        self.guild_id = route.guild_id
+
+class ResponseCache:
+    """A bounded LRU cache for the responses of rarely changing REST endpoints.
+
+    Only GET routes with a TTL are cached. When the library itself performs a
+    request that changes one of the cached resources, e.g. an unban, the
+    affected entries are dropped.
+
+    Parameters
+    -----------
+    loop
+        The event loop used to tell the time.
+    max_size : int
+        The maximum number of responses to keep. The least recently used one
+        is evicted once it's exceeded. Defaults to 1000.
+    ttls : Optional[dict]
+        A mapping of route paths, e.g. ``'/users/{user_id}'``, to the number of
+        seconds their responses stay fresh. Defaults to :attr:`DEFAULT_TTLS`.
+
+    Attributes
+    -----------
+    hits : int
+        The number of requests that were answered from the cache.
+    misses : int
+        The number of cacheable requests that had to be made.
+    invalidations : int
+        The number of entries dropped because of a mutation.
+    evictions : int
+        The number of entries dropped because the cache was full.
+    """
+
+    DEFAULT_TTLS = {
+        '/users/{user_id}': 300.0,
+        '/invite/{invite_id}': 60.0,
+        '/guilds/{guild_id}/invites': 30.0,
+        '/guilds/{guild_id}/bans': 60.0,
+        '/oauth2/applications/@me': 3600.0,
+        '/gateway': 3600.0,
+    }
+
+    # (method, path) of a mutation -> list of (cached path, how the entries are matched)
+    # 'guild' only drops the entries for the same guild, 'url' only the ones for the
+    # same url and 'all' every entry of the cached path.
+    INVALIDATIONS = {
+        ('PUT', '/guilds/{guild_id}/bans/{user_id}'): [('/guilds/{guild_id}/bans', 'guild')],
+        ('DELETE', '/guilds/{guild_id}/bans/{user_id}'): [('/guilds/{guild_id}/bans', 'guild')],
+        ('POST', '/channels/{channel_id}/invites'): [('/guilds/{guild_id}/invites', 'all')],
+        ('DELETE', '/invite/{invite_id}'): [('/invite/{invite_id}', 'url'), ('/guilds/{guild_id}/invites', 'all')],
+        ('POST', '/invite/{invite_id}'): [('/invite/{invite_id}', 'url'), ('/guilds/{guild_id}/invites', 'all')],
+        ('PATCH', '/users/@me'): [('/users/{user_id}', 'all')],
+    }
+
+    def __init__(self, *, loop, max_size=1000, ttls=None):
+        self.loop = loop
+        self.max_size = max_size
+        self.ttls = dict(self.DEFAULT_TTLS if ttls is None else ttls)
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _key(route, params):
+        return (route.url, tuple(sorted(params.items())) if params else None)
+
+    def is_cacheable(self, route):
+        return route.method == 'GET' and route.path in self.ttls
+
+    def get(self, route, params=None):
+        """Returns a copy of the fresh cached response for the route or ``_MISSING``."""
+        key = self._key(route, params)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires > self.loop.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry.data)
+            del self._entries[key]
+
+        self.misses += 1
+        return _MISSING
+
+    def put(self, route, params, data):
+        key = self._key(route, params)
+        expires = self.loop.time() + self.ttls[route.path]
+        self._entries[key] = _Entry(copy.deepcopy(data), expires, route)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, route):
+        """Drops the entries that a request to the given route could have changed."""
+        rules = self.INVALIDATIONS.get((route.method, route.path))
+        if not rules:
+            return
+
+        def matches(entry):
+            for path, match in rules:
+                if entry.path != path:
+                    continue
+                if match == 'all':
+                    return True
+                if match == 'guild' and entry.guild_id == route.guild_id:
+                    return True
+                if match == 'url' and entry.url == route.url:
+                    return True
+            return False
+
+        stale = [key for key, entry in self._entries.items() if matches(entry)]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        """Returns a ``CacheStats`` namedtuple with the ``hits``, ``misses``,
+        ``invalidations``, ``evictions`` and current ``size`` of the cache."""
+        return CacheStats(self.hits, self.misses, self.invalidations, self.evictions, len(self._entries))
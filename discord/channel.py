@@ -27,7 +27,7 @@ import copy
 from . import utils
 from .permissions import Permissions, PermissionOverwrite
 from .enums import ChannelType
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
 from .mixins import Hashable
 from .role import Role
 from .user import User
@@ -74,20 +74,17 @@ class Channel(Hashable):
         the channel type is not within the ones recognised by the enumerator.
     bitrate : int
         The channel's preferred audio bitrate in bits per second.
-    voice_members
-        A list of :class:`Members` that are currently inside this voice channel.
-        If :attr:`type` is not :attr:`ChannelType.voice` then this is always an empty array.
     user_limit : int
         The channel's limit for number of members that can be in a voice channel.
     """
 
-    __slots__ = [ 'voice_members', 'name', 'id', 'server', 'topic', 'position',
+    __slots__ = [ '_voice_members', 'name', 'id', 'server', 'topic', 'position',
                   'is_private', 'type', 'bitrate', 'user_limit',
                   '_permission_overwrites' ]
 
     def __init__(self, **kwargs):
         self._update(**kwargs)
-        self.voice_members = []
+        self._voice_members = OrderedDict()
 
     def __str__(self):
         return self.name
@@ -131,6 +128,21 @@ class Channel(Hashable):
         if tmp:
             tmp[everyone_index], tmp[0] = tmp[0], tmp[everyone_index]
 
+    @property
+    def voice_members(self):
+        """A list of :class:`Member` that are currently inside this voice channel.
+
+        The members are kept in the order they joined the channel.
+        If :attr:`type` is not :attr:`ChannelType.voice` then this is always an empty list.
+        """
+        return list(self._voice_members.values())
+
+    def _add_voice_member(self, member):
+        self._voice_members[member.id] = member
+
+    def _remove_voice_member(self, member):
+        self._voice_members.pop(member.id, None)
+
     @property
     def changed_roles(self):
         """Returns a list of :class:`Roles` that have been overridden from
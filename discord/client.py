@@ -38,9 +38,12 @@ from .errors import *
 from .state import ConnectionState
 from .permissions import Permissions, PermissionOverwrite
 from . import utils, compat
-from .enums import ChannelType, ServerRegion, VerificationLevel, Status
+from .enums import ChannelType, ServerRegion, VerificationLevel, Status, RequestPriority
 from .voice_client import VoiceClient
-from .iterators import LogsFromIterator
+from .voice_scheduler import VoiceScheduler
+from .iterators import LogsFromIterator, ReactionUsersIterator, MemberListIterator
+from .purge import ChannelPurger
+from .export import HistoryExporter, NDJSONSink
 from .gateway import *
 from .emoji import Emoji
 from .http import HTTPClient
@@ -50,10 +53,11 @@ import aiohttp
 import websockets
 
 import logging, traceback
-import sys, re, io, enum
+import sys, re, enum
 import tempfile, os, hashlib
 import itertools
 import datetime
+import functools
 from collections import namedtuple
 from os.path import split as path_split
 
@@ -62,6 +66,7 @@ log = logging.getLogger(__name__)
 
 AppInfo = namedtuple('AppInfo', 'id name description icon owner')
 WaitedReaction = namedtuple('WaitedReaction', 'reaction user')
+BulkResult = namedtuple('BulkResult', 'item result error')
 
 def app_info_icon_url(self):
     """Retrieves the application's icon_url if it exists. Empty string otherwise."""
@@ -106,10 +111,79 @@ class Client:
     connector : aiohttp.BaseConnector
         The `connector`_ to use for connection pooling. Useful for proxies, e.g.
         with a `ProxyConnector`_.
+    http_pool_size : Optional[int]
+        The maximum number of simultaneous connections to the Discord API.
+        Defaults to ``20``, the limit aiohttp uses by default. ``None`` removes
+        the limit. Ignored if ``connector`` is passed.
+    http_keepalive_timeout : Optional[float]
+        The number of seconds an idle connection is kept alive for reuse.
+        Defaults to ``30.0``. Ignored if ``connector`` is passed.
+    dns_cache_ttl : Optional[float]
+        The number of seconds DNS lookups are cached for. Defaults to ``None``,
+        which caches them for the lifetime of the connector. Ignored if ``connector`` is passed.
+    tcp_nodelay : Optional[bool]
+        Whether to disable Nagle's algorithm on API connections. Defaults to ``True``.
+        Ignored if ``connector`` is passed.
+    ratelimit_socket : Optional[str]
+        The path of the unix socket of a rate limit coordinator, started with
+        ``python -m discord.ratelimit PATH``. Processes using the same token and
+        coordinator share their rate limit state, including global rate limits.
+        If the coordinator can't be reached the client falls back to its own
+        rate limiting. Defaults to ``None``.
+    retry_policy : Optional[:class:`RetryPolicy`]
+        Decides which failed REST requests are retried and how long to wait
+        in between. Defaults to ``RetryPolicy()``.
+    circuit_breaker_threshold : Optional[int]
+        The number of consecutive server errors or connection failures after
+        which requests to an endpoint raise :exc:`CircuitOpen` instead of being
+        sent. Defaults to ``5``. ``None`` disables circuit breaking.
+    circuit_breaker_timeout : Optional[float]
+        The number of seconds an endpoint's circuit stays open before a request
+        is let through to check if the API has recovered. Defaults to ``30.0``.
     shard_id : Optional[int]
         Integer starting at 0 and less than shard_count.
     shard_count : Optional[int]
         The total number of shards.
+    columnar_member_threshold : Optional[int]
+        Servers with at least this many members keep their members in a
+        column oriented store, with :class:`Member` objects built on demand.
+        This greatly reduces memory usage for very large servers at the cost of
+        slower member lookups. Defaults to ``None``, which disables it.
+    max_http_concurrency : Optional[int]
+        The maximum number of REST requests that can be in flight at once. Defaults to ``50``.
+    http_priority_limits : Optional[dict]
+        A mapping of :class:`RequestPriority` to the maximum number of in flight REST
+        requests of that priority. By default normal requests are capped at 40 and bulk
+        requests at 10 so that interactive requests always have room.
+    cache_responses : Optional[bool]
+        Indicates if the responses of rarely changing REST endpoints, such as
+        :meth:`get_user_info` or :meth:`get_bans`, should be cached for a short while.
+        Mutations done through the library drop the affected entries. Hit and miss
+        counts are available through ``client.http.response_cache.stats()``.
+        Defaults to ``False``.
+    response_cache_size : Optional[int]
+        The maximum number of responses kept when ``cache_responses`` is enabled.
+        Defaults to ``1000``.
+    batch_events : Optional[Iterable[str]]
+        Names of events (without the ``on_`` prefix) that should be buffered and
+        delivered in batches rather than one task per event, e.g. ``['typing', 'reaction_add']``.
+        A batched event is delivered to ``on_<event>_batch`` if it is defined, otherwise
+        it is dispatched normally. See :ref:`discord-api-batched-events` for more details.
+    batch_interval : Optional[float]
+        The number of seconds to buffer a batched event before delivering it. Defaults to ``1.0``.
+    batch_size : Optional[int]
+        The number of buffered items that causes a batch to be delivered before
+        ``batch_interval`` has elapsed. Defaults to ``100``.
+    voice_scheduler : Optional[bool]
+        Indicates if the audio of all voice connections should be sent by a single
+        :class:`VoiceScheduler` on the event loop instead of one thread per player.
+        Defaults to ``False``.
+    voice_workers : Optional[int]
+        The number of threads the :class:`VoiceScheduler` reads and encodes audio with.
+        They are shared by every player. Reading from a stream that delivers its audio
+        in real time, such as a live stream, occupies a thread while it waits, and the
+        other players stall once all threads are occupied. Use at least one thread
+        more than the number of such streams playing at once. Defaults to ``2``.
 
     Attributes
     -----------
@@ -134,6 +208,9 @@ class Client:
         The websocket gateway the client is currently connected to. Could be None.
     loop
         The `event loop`_ that the client uses for HTTP requests and websocket operations.
+    voice_scheduler : Optional[:class:`VoiceScheduler`]
+        The scheduler sending the audio of all voice connections if the
+        ``voice_scheduler`` option was set, otherwise ``None``.
 
     """
     def __init__(self, *, loop=None, **options):
@@ -144,16 +221,42 @@ class Client:
         self.cache_auth = options.get('cache_auth', True)
         self.shard_id = options.get('shard_id')
         self.shard_count = options.get('shard_count')
+        self._batch_events = frozenset(options.get('batch_events', ()))
+        self._batch_interval = options.get('batch_interval', 1.0)
+        self._batch_size = options.get('batch_size', 100)
+        self._batches = {}
+        self._batch_handles = {}
+
+        self.voice_scheduler = None
+        if options.get('voice_scheduler', False):
+            self.voice_scheduler = VoiceScheduler(loop=self.loop, workers=options.get('voice_workers', 2))
 
         max_messages = options.get('max_messages')
         if max_messages is None or max_messages < 100:
             max_messages = 5000
 
         self.connection = ConnectionState(self.dispatch, self.request_offline_members,
-                                          self._syncer, max_messages, loop=self.loop)
+                                          self._syncer, max_messages, loop=self.loop,
+                                          columnar_threshold=options.get('columnar_member_threshold'))
 
         connector = options.pop('connector', None)
-        self.http = HTTPClient(connector, loop=self.loop)
+        self.http = HTTPClient(connector, loop=self.loop,
+                               max_concurrency=options.get('max_http_concurrency', 50),
+                               priority_limits=options.get('http_priority_limits'),
+                               response_cache=options.get('cache_responses', False),
+                               response_cache_size=options.get('response_cache_size', 1000),
+                               pool_size=options.get('http_pool_size', 20),
+                               keepalive_timeout=options.get('http_keepalive_timeout', 30.0),
+                               dns_cache_ttl=options.get('dns_cache_ttl'),
+                               tcp_nodelay=options.get('tcp_nodelay', True),
+                               ratelimit_socket=options.get('ratelimit_socket'),
+                               retry_policy=options.get('retry_policy'),
+                               circuit_breaker_threshold=options.get('circuit_breaker_threshold', 5),
+                               circuit_breaker_timeout=options.get('circuit_breaker_timeout', 30.0))
+
+        # expose the timings of every REST request through on_http_request
+        self.http.on_request = functools.partial(self.dispatch, 'http_request')
+        self.http.resolve_guild = self._guild_id_of_channel
 
         self._closed = asyncio.Event(loop=self.loop)
         self._is_logged_in = asyncio.Event(loop=self.loop)
@@ -165,6 +268,11 @@ class Client:
 
     # internals
 
+    def _guild_id_of_channel(self, channel_id):
+        channel = self.connection.get_channel(channel_id)
+        server = getattr(channel, 'server', None)
+        return server.id if server is not None else None
+
     @asyncio.coroutine
     def _syncer(self, guilds):
         yield from self.ws.request_sync(guilds)
@@ -321,9 +429,31 @@ class Client:
         if hasattr(self, handler):
             getattr(self, handler)(*args, **kwargs)
 
-        if hasattr(self, method):
+        # a batch item can't carry keyword arguments, those are dispatched normally
+        if not kwargs and event in self._batch_events and hasattr(self, method + '_batch'):
+            self._buffer_event(event, args)
+        elif hasattr(self, method):
             compat.create_task(self._run_event(method, *args, **kwargs), loop=self.loop)
 
+    def _buffer_event(self, event, args):
+        batch = self._batches.setdefault(event, [])
+        batch.append(args[0] if len(args) == 1 else args)
+
+        if len(batch) >= self._batch_size:
+            self._flush_batch(event)
+        elif event not in self._batch_handles:
+            self._batch_handles[event] = self.loop.call_later(self._batch_interval, self._flush_batch, event)
+
+    def _flush_batch(self, event):
+        handle = self._batch_handles.pop(event, None)
+        if handle is not None:
+            handle.cancel()
+
+        batch = self._batches.pop(event, None)
+        if batch:
+            method = 'on_' + event + '_batch'
+            compat.create_task(self._run_event(method, batch), loop=self.loop)
+
     @asyncio.coroutine
     def on_error(self, event_method, *args, **kwargs):
         """|coro|
@@ -472,9 +602,16 @@ class Client:
 
             self.connection._remove_voice_client(voice.server.id)
 
+        if self.voice_scheduler is not None:
+            self.voice_scheduler.close()
+
         if self.ws is not None and self.ws.open:
             yield from self.ws.close()
 
+        # deliver whatever is still buffered so it doesn't get lost
+        for event in list(self._batches):
+            self._flush_batch(event)
+
 
         yield from self.http.close()
         self._closed.set()
@@ -580,6 +717,33 @@ class Client:
             for channel in server.channels:
                 yield channel
 
+    def request_priority(self, priority):
+        """Returns a context manager that sets the :class:`RequestPriority` of
+        every API request made by the current task inside of it.
+
+        Requests are scheduled by priority, so for example a background job can
+        mark itself as bulk work to keep it from delaying command replies: ::
+
+            with client.request_priority(discord.RequestPriority.bulk):
+                for member in members:
+                    yield from client.add_roles(member, role)
+
+        The current queue depth and wait times of every priority can be
+        retrieved through ``client.http.scheduler.stats()``.
+        """
+        return self.http.use_priority(priority)
+
+    def get_all_occupied_voice_channels(self):
+        """A generator that retrieves every voice :class:`Channel` that currently
+        has at least one member connected to it.
+
+        Unlike filtering :meth:`get_all_channels`, this only looks at the members
+        that are in voice, so it does not walk every channel of every server.
+        """
+
+        for server in self.servers:
+            yield from server.occupied_voice_channels
+
     def get_all_members(self):
         """Returns a generator with every :class:`Member` the client can see.
 
@@ -1041,6 +1205,60 @@ class Client:
 
         return [User(**user) for user in data]
 
+    def reaction_users(self, reaction, *, limit=None, after=None, ids_only=False, prefetch=1):
+        """Returns an iterator over all the users that added a reaction to a message.
+
+        Unlike :meth:`get_reaction_users`, this pages through every user, fetching
+        the next page of 100 users in the background while the current one is used.
+
+        Parameters
+        ------------
+        reaction : :class:`Reaction`
+            The reaction to retrieve users for.
+        limit : Optional[int]
+            The maximum number of users to return. ``None`` returns all of them.
+        after : :class:`Member` or :class:`Object`
+            The user after which to start, as users are sorted by ID.
+        ids_only : bool
+            If ``True``, the IDs of the users are returned instead of :class:`User`
+            objects, which is much faster for large reactions. Defaults to ``False``.
+        prefetch : int
+            The number of pages to fetch ahead. Defaults to 1.
+
+        Raises
+        --------
+        InvalidArgument
+            The reaction parameter is invalid.
+
+        Examples
+        ---------
+
+        Drawing a winner: ::
+
+            entrants = []
+            async for page in client.reaction_users(reaction, ids_only=True).pages():
+                entrants.extend(page)
+            winner = random.choice(entrants)
+
+        Python 3.4 Usage ::
+
+            iterator = client.reaction_users(reaction)
+            while True:
+                page = yield from iterator.next_page()
+                if not page:
+                    break
+        """
+        if not isinstance(reaction, Reaction):
+            raise InvalidArgument('reaction must be a Reaction')
+
+        emoji = reaction.emoji
+        if isinstance(emoji, Emoji):
+            emoji = '{}:{}'.format(emoji.name, emoji.id)
+
+        message = reaction.message
+        return ReactionUsersIterator(self, message.id, message.channel.id, emoji, limit=limit,
+                                     after=getattr(after, 'id', None), ids_only=ids_only, prefetch=prefetch)
+
     @asyncio.coroutine
     def clear_reactions(self, message):
         """|coro|
@@ -1064,7 +1282,7 @@ class Client:
         yield from self.http.clear_reactions(message.id, message.channel.id)
 
     @asyncio.coroutine
-    def send_message(self, destination, content=None, *, tts=False, embed=None):
+    def send_message(self, destination, content=None, *, tts=False, embed=None, priority=None):
         """|coro|
 
         Sends a message to the destination given with the content given.
@@ -1100,6 +1318,9 @@ class Client:
             Indicates if the message should be sent using text-to-speech.
         embed: :class:`Embed`
             The rich embed for the content.
+        priority: Optional[:class:`RequestPriority`]
+            The scheduling priority of the request. Defaults to the one set
+            through :meth:`request_priority`, or :attr:`RequestPriority.normal`.
 
         Raises
         --------
@@ -1148,7 +1369,8 @@ class Client:
         if embed is not None:
             embed = embed.to_dict()
 
-        data = yield from self.http.send_message(channel_id, content, guild_id=guild_id, tts=tts, embed=embed)
+        data = yield from self.http.send_message(channel_id, content, guild_id=guild_id, tts=tts, embed=embed,
+                                                 priority=priority)
         channel = self.get_channel(data.get('channel_id'))
         message = self.connection._create_message(channel=channel, **data)
         return message
@@ -1173,7 +1395,7 @@ class Client:
         yield from self.http.send_typing(channel_id)
 
     @asyncio.coroutine
-    def send_file(self, destination, fp, *, filename=None, content=None, tts=False):
+    def send_file(self, destination, fp, *, filename=None, content=None, tts=False, priority=None, progress=None):
         """|coro|
 
         Sends a message to the destination given with the file given.
@@ -1207,6 +1429,10 @@ class Client:
             forced into a string by a ``str(content)`` call.
         tts : bool
             If the content of the message should be sent with TTS enabled.
+        priority : Optional[:class:`RequestPriority`]
+            The scheduling priority of the request. See :meth:`send_message`.
+        progress
+            An optional upload progress callback. See :meth:`send_files`.
 
         Raises
         -------
@@ -1219,19 +1445,77 @@ class Client:
             The message sent.
         """
 
+        return (yield from self.send_files(destination, [(fp, filename)], content=content, tts=tts,
+                                           priority=priority, progress=progress))
+
+    @asyncio.coroutine
+    def send_files(self, destination, files, *, content=None, tts=False, priority=None, progress=None):
+        """|coro|
+
+        Sends a single message to the destination given with all the files given.
+
+        The destination parameter follows the same rules as :meth:`send_message`.
+
+        Every element of ``files`` is either a file path, a *file-like object* or a
+        ``(fp, filename)`` tuple, with the same rules as the ``fp`` and ``filename``
+        parameters of :meth:`send_file`. The files are streamed to Discord in chunks
+        rather than read into memory. Files opened from a path are closed
+        once the upload is done, passed *file-like objects* are not.
+
+        Parameters
+        ------------
+        destination
+            The location to send the message.
+        files
+            The list of files to send.
+        content
+            The content of the message to send along with the files. This is
+            forced into a string by a ``str(content)`` call.
+        tts : bool
+            If the content of the message should be sent with TTS enabled.
+        priority : Optional[:class:`RequestPriority`]
+            The scheduling priority of the request. See :meth:`send_message`.
+        progress
+            An optional callable that is called with the number of bytes sent so far
+            and the total number of bytes, which is ``None`` if it isn't known. If the
+            upload is retried the count starts over.
+
+        Raises
+        -------
+        HTTPException
+            Sending the files failed.
+
+        Returns
+        --------
+        :class:`Message`
+            The message sent.
+        """
+
         channel_id, guild_id = yield from self._resolve_destination(destination)
 
+        opened = []
+        uploads = []
         try:
-            with open(fp, 'rb') as f:
-                buffer = io.BytesIO(f.read())
-                if filename is None:
-                    _, filename = path_split(fp)
-        except TypeError:
-            buffer = fp
+            for entry in files:
+                fp, filename = entry if isinstance(entry, tuple) else (entry, None)
+                if isinstance(fp, str):
+                    f = open(fp, 'rb')
+                    opened.append(f)
+                    if filename is None:
+                        _, filename = path_split(fp)
+                    fp = f
+                elif filename is None:
+                    filename = os.path.basename(getattr(fp, 'name', '')) or None
+
+                uploads.append((fp, filename))
+
+            content = str(content) if content is not None else None
+            data = yield from self.http.send_files(channel_id, uploads, content=content, tts=tts,
+                                                   priority=priority, progress=progress)
+        finally:
+            for f in opened:
+                f.close()
 
-        content = str(content) if content is not None else None
-        data = yield from self.http.send_file(channel_id, buffer, guild_id=guild_id,
-                                              filename=filename, content=content, tts=tts)
         channel = self.get_channel(data.get('channel_id'))
         message = self.connection._create_message(channel=channel, **data)
         return message
@@ -1301,13 +1585,18 @@ class Client:
         yield from self.http.delete_messages(channel.id, message_ids, guild_id)
 
     @asyncio.coroutine
-    def purge_from(self, channel, *, limit=100, check=None, before=None, after=None, around=None):
+    def purge_from(self, channel, *, limit=100, check=None, before=None, after=None, around=None,
+                         concurrency=5, progress=None):
         """|coro|
 
         Purges a list of messages that meet the criteria given by the predicate
         ``check``. If a ``check`` is not provided then all messages are deleted
         without discrimination.
 
+        Messages are deleted while the channel's history is still being fetched.
+        Messages younger than 14 days are bulk deleted 100 at a time and older
+        ones, which can't be bulk deleted, one by one.
+
         You must have Manage Messages permission to delete messages even if they
         are your own. The Read Message History permission is also needed to
         retrieve message history.
@@ -1333,6 +1622,11 @@ class Client:
         around : :class:`Message` or `datetime`
             The message or date around which all deleted messages must be.
             If a date is provided it must be a timezone-naive datetime representing UTC time.
+        concurrency : int
+            The maximum number of delete requests running at once. Defaults to 5.
+        progress
+            A function called with a :class:`PurgeProgress` whenever a delete
+            request finishes and once the purge is done.
 
         Raises
         -------
@@ -1359,9 +1653,12 @@ class Client:
             The list of messages that were deleted.
         """
 
-        if check is None:
-            check = lambda m: True
+        semaphore = asyncio.Semaphore(concurrency, loop=self.loop)
+        purger = self._make_purger(channel, limit=limit, check=check, before=before, after=after, around=around,
+                                   semaphore=semaphore, progress=progress)
+        return (yield from purger.run())
 
+    def _make_purger(self, channel, *, before=None, after=None, around=None, **kwargs):
         if isinstance(before, datetime.datetime):
             before = Object(utils.time_snowflake(before, high=False))
         if isinstance(after, datetime.datetime):
@@ -1369,35 +1666,64 @@ class Client:
         if isinstance(around, datetime.datetime):
             around = Object(utils.time_snowflake(around, high=True))
 
-        iterator = LogsFromIterator(self, channel, limit, before=before, after=after, around=around)
-        ret = []
-        count = 0
+        return ChannelPurger(self, channel, before=before, after=after, around=around, **kwargs)
+
+    @asyncio.coroutine
+    def purge_channels(self, channels, *, limit=100, check=None, before=None, after=None,
+                             concurrency=10, priority=RequestPriority.bulk, progress=None):
+        """|coro|
+
+        Purges several channels at once, as :meth:`purge_from` does for a single one.
 
-        while True:
+        Every channel is fetched and purged concurrently. ``concurrency`` bounds the
+        number of delete requests running at once over all the channels, while the
+        rate limits of each channel are still respected. A failure in one channel
+        does not stop the others.
+
+        Parameters
+        -----------
+        channels
+            An iterable of :class:`Channel` to purge.
+        limit : int
+            The number of messages to search through in every channel.
+        check : predicate
+            The function used to check if a message should be deleted.
+            It must take a :class:`Message` as its sole parameter.
+        before : :class:`Message` or `datetime`
+            The message or date before which all deleted messages must be.
+        after : :class:`Message` or `datetime`
+            The message or date after which all deleted messages must be.
+        concurrency : int
+            The maximum number of delete requests running at once. Defaults to 10.
+        priority : :class:`RequestPriority`
+            The scheduling priority of the requests. Defaults to :attr:`RequestPriority.bulk`.
+        progress
+            A function called with a :class:`PurgeProgress` whenever a delete
+            request finishes and once a channel is done.
+
+        Returns
+        --------
+        List[:class:`BulkResult`]
+            The result of every channel in the order they were given, with
+            the list of deleted messages as the result.
+        """
+
+        semaphore = asyncio.Semaphore(concurrency, loop=self.loop)
+
+        @asyncio.coroutine
+        def run(channel):
+            purger = self._make_purger(channel, limit=limit, check=check, before=before, after=after,
+                                       semaphore=semaphore, priority=priority, progress=progress)
             try:
-                msg = yield from iterator.iterate()
-            except asyncio.QueueEmpty:
-                # no more messages to poll
-                if count >= 2:
-                    # more than 2 messages -> bulk delete
-                    to_delete = ret[-count:]
-                    yield from self.delete_messages(to_delete)
-                elif count == 1:
-                    # delete a single message
-                    yield from self.delete_message(ret[-1])
-
-                return ret
-            else:
-                if count == 100:
-                    # we've reached a full 'queue'
-                    to_delete = ret[-100:]
-                    yield from self.delete_messages(to_delete)
-                    count = 0
-                    yield from asyncio.sleep(1, loop=self.loop)
+                with self.http.use_priority(priority):
+                    deleted = yield from purger.run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                return BulkResult(channel, None, e)
+            return BulkResult(channel, deleted, None)
 
-                if check(msg):
-                    count += 1
-                    ret.append(msg)
+        return (yield from asyncio.gather(*[run(channel) for channel in channels], loop=self.loop))
 
     @asyncio.coroutine
     def edit_message(self, message, new_content=None, *, embed=None):
@@ -1563,6 +1889,10 @@ class Client:
         around : :class:`Message` or `datetime`
             The message or date around which all returned messages must be.
             If a date is provided it must be a timezone-naive datetime representing UTC time.
+        prefetch : int
+            The number of pages of 100 messages to fetch ahead in the background while
+            the current one is being consumed. Only available with Python 3.5 or higher.
+            Defaults to 0.
 
         Raises
         ------
@@ -1595,6 +1925,11 @@ class Client:
             async for message in client.logs_from(channel, limit=500):
                 if message.author == client.user:
                     counter += 1
+
+        Fetching pages of messages ahead of time: ::
+
+            async for page in client.logs_from(channel, limit=5000, prefetch=2).pages():
+                archive.extend(page)
         """
         before = getattr(before, 'id', None)
         after  = getattr(after, 'id', None)
@@ -1603,7 +1938,7 @@ class Client:
         return self.http.logs_from(channel.id, limit, before=before, after=after, around=around)
 
     if PY35:
-        def logs_from(self, channel, limit=100, *, before=None, after=None, around=None, reverse=False):
+        def logs_from(self, channel, limit=100, *, before=None, after=None, around=None, reverse=False, prefetch=0):
             if isinstance(before, datetime.datetime):
                 before = Object(utils.time_snowflake(before, high=False))
             if isinstance(after, datetime.datetime):
@@ -1611,7 +1946,8 @@ class Client:
             if isinstance(around, datetime.datetime):
                 around = Object(utils.time_snowflake(around))
 
-            return LogsFromIterator(self, channel, limit, before=before, after=after, around=around, reverse=reverse)
+            return LogsFromIterator(self, channel, limit, before=before, after=after, around=around, reverse=reverse,
+                                    prefetch=prefetch)
     else:
         @asyncio.coroutine
         def logs_from(self, channel, limit=100, *, before=None, after=None):
@@ -1639,8 +1975,154 @@ class Client:
 
     logs_from.__doc__ = _logs_from.__doc__
 
+    def _snowflake_from(self, value, *, high):
+        if value is None:
+            return None
+        if isinstance(value, datetime.datetime):
+            return str(utils.time_snowflake(value, high=high))
+        return getattr(value, 'id', value)
+
+    @asyncio.coroutine
+    def export_history(self, channel, destination, *, limit=None, before=None, after=None,
+                             compress=False, checkpoint=None):
+        """|coro|
+
+        Exports the history of a channel as raw message payloads, one JSON
+        object per line.
+
+        Unlike :meth:`logs_from`, no :class:`Message` objects are created.
+        The payloads are written exactly as Discord returns them and the next
+        page of messages is fetched while the current one is being written.
+
+        Without ``after`` the history is exported from the newest message
+        backwards, otherwise it is exported forwards in chronological order.
+
+        Parameters
+        -----------
+        channel : :class:`Channel` or :class:`PrivateChannel`
+            The channel to export.
+        destination
+            The path of the file to append the messages to, or a coroutine
+            function called with every page of message payloads.
+        limit : Optional[int]
+            The maximum number of messages to export. ``None`` exports all of them.
+        before : :class:`Message` or `datetime`
+            The message or date before which all exported messages must be.
+        after : :class:`Message` or `datetime`
+            The message or date after which all exported messages must be.
+        compress : bool
+            Whether to gzip the file. Defaults to ``False``.
+        checkpoint : Optional[str]
+            The path of a file to save the export's position to after every page.
+            Starting an export again with the same checkpoint resumes it, after
+            cutting the file back to the last saved page. A checkpoint can't be
+            used for another channel.
+
+        Raises
+        -------
+        Forbidden
+            You do not have permissions to get channel logs.
+        HTTPException
+            Fetching the logs failed.
+        ClientException
+            The checkpoint belongs to another channel or the file is shorter
+            than the checkpoint expects.
+
+        Returns
+        --------
+        int
+            The number of messages exported, including those of resumed runs.
+        """
+
+        before = self._snowflake_from(before, high=False)
+        after = self._snowflake_from(after, high=True)
+
+        sink = destination
+        if isinstance(destination, str):
+            sink = NDJSONSink(destination, compress=compress, loop=self.loop)
+
+        exporter = HistoryExporter(self.http, channel.id, sink, limit=limit, before=before, after=after,
+                                   checkpoint=checkpoint)
+        try:
+            return (yield from exporter.run())
+        finally:
+            if sink is not destination:
+                yield from sink.close()
+
+    @asyncio.coroutine
+    def export_channels(self, channels, directory, *, limit=None, compress=False, concurrency=4,
+                              priority=RequestPriority.bulk):
+        """|coro|
+
+        Exports the history of several channels at once with :meth:`export_history`.
+
+        Every channel is written to ``<channel id>.ndjson`` (or ``.ndjson.gz``) in
+        ``directory``, with its checkpoint next to it, so running the same export
+        again resumes the channels that didn't finish.
+
+        Parameters
+        -----------
+        channels
+            An iterable of :class:`Channel` to export.
+        directory : str
+            The directory to write the files to.
+        limit : Optional[int]
+            The maximum number of messages to export per channel.
+        compress : bool
+            Whether to gzip the files. Defaults to ``False``.
+        concurrency : int
+            The maximum number of channels exported at once. Defaults to 4.
+        priority : :class:`RequestPriority`
+            The scheduling priority of the requests. Defaults to :attr:`RequestPriority.bulk`.
+
+        Returns
+        --------
+        List[:class:`BulkResult`]
+            The result of every channel in the order they were given, with
+            the number of exported messages as the result.
+        """
+
+        extension = '.ndjson.gz' if compress else '.ndjson'
+
+        def export(channel):
+            path = os.path.join(directory, channel.id + extension)
+            checkpoint = os.path.join(directory, channel.id + '.checkpoint.json')
+            return self.export_history(channel, path, limit=limit, compress=compress, checkpoint=checkpoint)
+
+        return (yield from self._bulk(channels, export, concurrency, priority))
+
     # Member management
 
+    def fetch_members(self, server, *, limit=None, after=None, prefetch=1):
+        """Returns an iterator over the members of a server fetched through the REST API.
+
+        Unlike :meth:`request_offline_members`, this doesn't go through the
+        gateway and doesn't touch the :attr:`Server.members` cache. Members are
+        returned as lightweight :class:`MemberRecord` tuples sorted by ID, 1000
+        at a time, with the next page fetched in the background.
+
+        Parameters
+        -----------
+        server : :class:`Server`
+            The server to list the members of.
+        limit : Optional[int]
+            The maximum number of members to return. ``None`` returns all of them.
+        after : :class:`Member` or :class:`Object`
+            The user after which to start.
+        prefetch : int
+            The number of pages to fetch ahead. Defaults to 1.
+
+        Examples
+        ---------
+
+        Counting the bots of a server: ::
+
+            bots = 0
+            async for page in client.fetch_members(server).pages():
+                bots += sum(1 for m in page if m.bot)
+        """
+        return MemberListIterator(self, server.id, limit=limit, after=getattr(after, 'id', None), prefetch=prefetch)
+
     @asyncio.coroutine
     def request_offline_members(self, server):
         """|coro|
@@ -3133,6 +3615,137 @@ class Client:
 
         yield from self.http.move_member(member.id, member.server.id, channel.id)
 
+    # Bulk moderation
+
+    @asyncio.coroutine
+    def _bulk(self, items, func, concurrency, priority):
+        semaphore = asyncio.Semaphore(concurrency, loop=self.loop)
+
+        @asyncio.coroutine
+        def run(item):
+            with (yield from semaphore):
+                # every item runs in its own task so this doesn't leak
+                with self.http.use_priority(priority):
+                    try:
+                        result = yield from func(item)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        # connection errors too, a failed item mustn't take down the others
+                        return BulkResult(item, None, e)
+                    return BulkResult(item, result, None)
+
+        return (yield from asyncio.gather(*[run(item) for item in items], loop=self.loop))
+
+    @asyncio.coroutine
+    def bulk_add_roles(self, members, *roles, concurrency=10, priority=RequestPriority.bulk):
+        """|coro|
+
+        Gives every :class:`Member` in ``members`` the specified :class:`Role` s.
+
+        This is the bulk version of :meth:`add_roles`. Up to ``concurrency`` members
+        are processed at once while still respecting the rate limits, and a failure
+        for one member does not stop the others.
+
+        Parameters
+        -----------
+        members
+            An iterable of :class:`Member` to give the roles to.
+        \*roles
+            An argument list of :class:`Role` s to give the members.
+        concurrency : int
+            The maximum number of members processed at once. Defaults to 10.
+        priority : :class:`RequestPriority`
+            The scheduling priority of the requests. Defaults to :attr:`RequestPriority.bulk`.
+
+        Returns
+        --------
+        List[:class:`BulkResult`]
+            The result of every member in the order they were given.
+        """
+
+        if len(roles) == 1:
+            role = roles[0]
+            func = lambda m: self.http.add_role(m.server.id, m.id, role.id)
+        else:
+            func = lambda m: self.add_roles(m, *roles)
+
+        return (yield from self._bulk(members, func, concurrency, priority))
+
+    @asyncio.coroutine
+    def bulk_remove_roles(self, members, *roles, concurrency=10, priority=RequestPriority.bulk):
+        """|coro|
+
+        Removes the :class:`Role` s from every :class:`Member` in ``members``.
+
+        This is the bulk version of :meth:`remove_roles`. The parameters and
+        return value are the same as :meth:`bulk_add_roles`.
+        """
+
+        if len(roles) == 1:
+            role = roles[0]
+            func = lambda m: self.http.remove_role(m.server.id, m.id, role.id)
+        else:
+            func = lambda m: self.remove_roles(m, *roles)
+
+        return (yield from self._bulk(members, func, concurrency, priority))
+
+    @asyncio.coroutine
+    def bulk_kick(self, members, *, concurrency=10, priority=RequestPriority.bulk):
+        """|coro|
+
+        Kicks every :class:`Member` in ``members`` from the server they belong to.
+
+        This is the bulk version of :meth:`kick`. See :meth:`bulk_add_roles` for
+        the meaning of the other parameters and the return value.
+        """
+        return (yield from self._bulk(members, self.kick, concurrency, priority))
+
+    @asyncio.coroutine
+    def bulk_ban(self, members, delete_message_days=1, *, concurrency=10, priority=RequestPriority.bulk):
+        """|coro|
+
+        Bans every :class:`Member` in ``members`` from the server they belong to.
+
+        This is the bulk version of :meth:`ban`. See :meth:`bulk_add_roles` for
+        the meaning of the other parameters and the return value.
+        """
+        func = lambda m: self.ban(m, delete_message_days)
+        return (yield from self._bulk(members, func, concurrency, priority))
+
+    @asyncio.coroutine
+    def bulk_move(self, members, channel, *, concurrency=10, priority=RequestPriority.bulk):
+        """|coro|
+
+        Moves every :class:`Member` in ``members`` to the voice ``channel``.
+
+        This is the bulk version of :meth:`move_member`. See :meth:`bulk_add_roles`
+        for the meaning of the other parameters and the return value.
+
+        Raises
+        -------
+        InvalidArgument
+            The channel provided is not a voice channel.
+        """
+
+        if getattr(channel, 'type', ChannelType.text) != ChannelType.voice:
+            raise InvalidArgument('The channel provided must be a voice channel.')
+
+        func = lambda m: self.move_member(m, channel)
+        return (yield from self._bulk(members, func, concurrency, priority))
+
+    @asyncio.coroutine
+    def bulk_change_nickname(self, members, nickname, *, concurrency=10, priority=RequestPriority.bulk):
+        """|coro|
+
+        Changes the nickname of every :class:`Member` in ``members``.
+
+        This is the bulk version of :meth:`change_nickname`. See :meth:`bulk_add_roles`
+        for the meaning of the other parameters and the return value.
+        """
+        func = lambda m: self.change_nickname(m, nickname)
+        return (yield from self._bulk(members, func, concurrency, priority))
+
     @asyncio.coroutine
     def join_voice_channel(self, channel):
         """|coro|
@@ -3202,7 +3815,8 @@ class Client:
             'data': data,
             'loop': self.loop,
             'session_id': session_id_data.get('session_id'),
-            'main_ws': self.ws
+            'main_ws': self.ws,
+            'scheduler': self.voice_scheduler
         }
 
         voice = VoiceClient(**kwargs)
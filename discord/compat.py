@@ -31,6 +31,11 @@ try:
 except AttributeError:
     create_task = asyncio.async
 
+try:
+    current_task = asyncio.current_task
+except AttributeError:
+    current_task = asyncio.Task.current_task
+
 try:
     run_coroutine_threadsafe = asyncio.run_coroutine_threadsafe
 except AttributeError:
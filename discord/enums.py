@@ -96,6 +96,14 @@ class DefaultAvatar(Enum):
     def __str__(self):
         return self.name
 
+class RequestPriority(Enum):
+    interactive = 0
+    normal      = 1
+    bulk        = 2
+
+    def __str__(self):
+        return self.name
+
 def try_enum(cls, val):
     """A function that tries to turn the value into enum ``cls``.
 
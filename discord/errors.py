@@ -88,6 +88,23 @@ class NotFound(HTTPException):
     """
     pass
 
+class CircuitOpen(DiscordException):
+    """Exception that's thrown when a request is not sent because the
+    API has been failing for its route.
+
+    Attributes
+    -----------
+    route : tuple
+        The ``(method, path)`` of the failing route.
+    retry_after : float
+        The number of seconds until a request to the route is attempted again.
+    """
+    def __init__(self, route, retry_after):
+        self.route = route
+        self.retry_after = retry_after
+        fmt = 'The API is failing for {0[0]} {0[1]}, retry in {1:.2f} seconds.'
+        super().__init__(fmt.format(route, retry_after))
+
 
 class InvalidArgument(ClientException):
     """Exception that's thrown when an argument to a function
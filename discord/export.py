@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-2016 Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+
+from . import utils, compat
+from .errors import ClientException
+
+class NDJSONSink:
+    """Appends raw message payloads to a newline delimited JSON file.
+
+    The file is written from the default executor so that compressing
+    and writing don't block the event loop.
+
+    Every page ends at a point the file can be cut back to, so that an
+    export resumed from a checkpoint can drop whatever an interrupted run
+    wrote after its last saved page.
+
+    Parameters
+    -----------
+    path : str
+        The path of the file. It is appended to if it exists.
+    compress : bool
+        Whether to gzip the file. Every page is written as a gzip member
+        of its own, which gzip readers handle transparently.
+    loop
+        The event loop to use.
+
+    Attributes
+    -----------
+    offset : Optional[int]
+        The size of the file after the last complete page, ``None``
+        until the file has been opened.
+    """
+
+    def __init__(self, path, *, compress=False, loop):
+        self.path = path
+        self.compress = compress
+        self.loop = loop
+        self.offset = None
+        self._fp = None
+
+    def _open(self):
+        if self._fp is None:
+            self._fp = open(self.path, 'ab')
+            self.offset = self._fp.seek(0, os.SEEK_END)
+
+    def _prepare(self, offset):
+        self._open()
+        if offset is not None:
+            if offset > self.offset:
+                raise ClientException('{} is shorter than the checkpoint expects'.format(self.path))
+            self._fp.truncate(offset)
+            self.offset = offset
+        return self.offset
+
+    def _write(self, data):
+        self._open()
+        if self.compress:
+            data = gzip.compress(data)
+        self._fp.write(data)
+        self._fp.flush()
+        self.offset = self._fp.tell()
+
+    @asyncio.coroutine
+    def prepare(self, offset=None):
+        """|coro|
+
+        Opens the file and cuts it back to ``offset`` bytes if given, dropping
+        anything written after that. Returns the size of the file.
+        """
+        return (yield from self.loop.run_in_executor(None, self._prepare, offset))
+
+    @asyncio.coroutine
+    def write(self, messages):
+        data = ''.join(utils.to_json(m) + '\n' for m in messages).encode('utf-8')
+        yield from self.loop.run_in_executor(None, self._write, data)
+
+    @asyncio.coroutine
+    def close(self):
+        if self._fp is not None:
+            fp, self._fp = self._fp, None
+            yield from self.loop.run_in_executor(None, fp.close)
+
+class HistoryExporter:
+    """Streams the raw message payloads of a channel's history to a sink.
+
+    Pages are written exactly as the API returns them, without building
+    :class:`Message` objects, and the next page is requested while the
+    current one is being written.
+
+    Without ``after`` the history is exported from the newest message
+    backwards. With ``after`` it is exported forwards from that message,
+    in chronological order, up to ``before`` if it is given as well.
+
+    If a ``checkpoint`` path is given, the cursor is saved there after every
+    page is written and an interrupted export started again with the same
+    checkpoint resumes where it stopped. A sink with a ``prepare`` coroutine
+    and an ``offset``, like :class:`NDJSONSink`, has its file cut back to the
+    last saved page first, so nothing is written twice or left half written.
+    Other sinks may receive the page written right before the interruption
+    again.
+
+    Parameters
+    -----------
+    http : :class:`HTTPClient`
+        The HTTP client to fetch the history with.
+    channel_id : str
+        The ID of the channel to export.
+    sink
+        Either an object with a ``write(messages)`` coroutine, like
+        :class:`NDJSONSink`, or a coroutine function called with every
+        page of message payloads.
+    limit : Optional[int]
+        The maximum number of messages to export. ``None`` exports all of them.
+    before : Optional[str]
+        The ID of the message before which to export.
+    after : Optional[str]
+        The ID of the message after which to export.
+    checkpoint : Optional[str]
+        The path of the file the cursor is saved to.
+    """
+
+    def __init__(self, http, channel_id, sink, *, limit=None, before=None, after=None, checkpoint=None):
+        self.http = http
+        self.loop = http.loop
+        self.channel_id = channel_id
+        self.sink = sink
+        self.limit = limit
+        self.before = before
+        self.after = after
+        self.forwards = after is not None
+        self.checkpoint = checkpoint
+        self.exported = 0
+        self.done = False
+        self.offset = None
+
+    def _load_checkpoint(self):
+        try:
+            with open(self.checkpoint, 'r') as fp:
+                state = json.load(fp)
+        except FileNotFoundError:
+            return False
+
+        if state.get('channel_id') != self.channel_id:
+            raise ClientException('The checkpoint {} belongs to another channel'.format(self.checkpoint))
+
+        self.offset = state.get('offset')
+        self.before = state.get('before')
+        self.after = state.get('after')
+        self.forwards = state.get('forwards', self.forwards)
+        self.exported = state.get('exported', 0)
+        self.done = state.get('done', False)
+        return True
+
+    def _save_checkpoint(self):
+        state = {
+            'channel_id': self.channel_id,
+            'before': self.before,
+            'after': self.after,
+            'forwards': self.forwards,
+            'exported': self.exported,
+            'done': self.done,
+            'offset': self.offset,
+        }
+
+        # replace the file in one go so a crash can't leave half of it behind
+        tmp = self.checkpoint + '.tmp'
+        with open(tmp, 'w') as fp:
+            json.dump(state, fp)
+        os.replace(tmp, self.checkpoint)
+
+    def _next_size(self, pending=0):
+        if self.limit is None:
+            return 100
+        return min(100, self.limit - self.exported - pending)
+
+    @asyncio.coroutine
+    def _fetch(self, cursor, size):
+        if self.forwards:
+            data = yield from self.http.logs_from(self.channel_id, size, after=cursor)
+            # the newest messages come first, write them oldest first
+            data.reverse()
+        else:
+            data = yield from self.http.logs_from(self.channel_id, size, before=cursor)
+        return data
+
+    @asyncio.coroutine
+    def _write(self, page):
+        write = getattr(self.sink, 'write', None)
+        if write is not None:
+            yield from write(page)
+        else:
+            yield from self.sink(page)
+
+    @asyncio.coroutine
+    def run(self):
+        """|coro|
+
+        Runs the export and returns the total number of messages exported,
+        including the ones of previous runs resumed from the checkpoint.
+        """
+        if self.checkpoint is not None:
+            resumed = yield from self.loop.run_in_executor(None, self._load_checkpoint)
+            prepare = getattr(self.sink, 'prepare', None)
+            if prepare is not None:
+                # drop what an interrupted run wrote after its last saved page
+                self.offset = yield from prepare(self.offset)
+                if not resumed:
+                    yield from self.loop.run_in_executor(None, self._save_checkpoint)
+
+        cursor = self.after if self.forwards else self.before
+        size = self._next_size()
+        pending = None
+        if not self.done and size > 0:
+            pending = compat.create_task(self._fetch(cursor, size), loop=self.loop)
+
+        try:
+            while pending is not None:
+                page = yield from pending
+                pending = None
+                finished = len(page) < size
+                if self.forwards and self.before is not None:
+                    # the API only takes one of the two, so stop at before ourselves
+                    bound = int(self.before)
+                    kept = [message for message in page if int(message['id']) < bound]
+                    if len(kept) != len(page):
+                        page = kept
+                        finished = True
+
+                if page:
+                    cursor = page[-1]['id']
+
+                # request the next page while this one is being written
+                size = self._next_size(len(page))
+                if not finished and size > 0:
+                    pending = compat.create_task(self._fetch(cursor, size), loop=self.loop)
+
+                if page:
+                    yield from self._write(page)
+                    self.exported += len(page)
+                    self.offset = getattr(self.sink, 'offset', None)
+
+                # only move the saved cursor once the page is written
+                if self.forwards:
+                    self.after = cursor
+                else:
+                    self.before = cursor
+                self.done = pending is None
+                if self.checkpoint is not None:
+                    yield from self.loop.run_in_executor(None, self._save_checkpoint)
+        except BaseException:
+            if pending is not None:
+                pending.cancel()
+            raise
+
+        return self.exported
@@ -482,6 +482,7 @@ class DiscordWebSocket(websockets.client.WebSocketClientProtocol):
 
             me.game = game
             me.status = status_enum
+            server._add_member(me)
 
     @asyncio.coroutine
     def request_sync(self, guild_ids):
@@ -30,13 +30,24 @@ import json
 import sys
 import logging
 import weakref
-import datetime
-from email.utils import parsedate_to_datetime
+import contextlib
+import copy
+import socket
+import io
+import os
+import time
+from collections import namedtuple
 
 log = logging.getLogger(__name__)
 
-from .errors import HTTPException, Forbidden, NotFound, LoginFailure, GatewayNotFound
-from . import __version__, utils
+from .errors import HTTPException, Forbidden, NotFound, LoginFailure, GatewayNotFound, ClientException
+from .enums import RequestPriority
+from .scheduler import RequestScheduler
+from .cache import ResponseCache, _MISSING
+from .ratelimit import RateLimitBucket, SharedRateLimiter, BUCKET_EVICTION_THRESHOLD, evict_idle_buckets
+from .metrics import HTTPMetrics, RequestInfo
+from .retry import RetryPolicy, CircuitBreaker
+from . import __version__, utils, compat
 
 @asyncio.coroutine
 def json_or_text(response):
@@ -46,40 +57,180 @@ def json_or_text(response):
     return text
 
 class Route:
+    __slots__ = ('path', 'method', 'url', 'channel_id', 'guild_id', 'bucket')
+
     BASE = 'https://discordapp.com/api/v6'
 
+    # (base, path) -> (url template, whether it has fields to format)
+    _templates = {}
+
     def __init__(self, method, path, **parameters):
         self.path = path
         self.method = method
-        url = (self.BASE + self.path)
-        if parameters:
-            self.url = url.format(**parameters)
-        else:
-            self.url = url
+
+        base = self.BASE
+        try:
+            url, has_fields = self._templates[base, path]
+        except KeyError:
+            url = base + path
+            has_fields = '{' in path
+            self._templates[base, path] = (url, has_fields)
+
+        self.url = url.format(**parameters) if parameters and has_fields else url
 
         # major parameters:
-        self.channel_id = parameters.get('channel_id')
-        self.guild_id = parameters.get('guild_id')
+        self.channel_id = channel_id = parameters.get('channel_id')
+        self.guild_id = guild_id = parameters.get('guild_id')
 
-    @property
-    def bucket(self):
         # the bucket is just method + path w/ major parameters
-        return '{0.method}:{0.channel_id}:{0.guild_id}:{0.path}'.format(self)
+        self.bucket = (method, channel_id, guild_id, path)
+
+class _UploadReader(io.IOBase):
+    """Streams a file to aiohttp in chunks while reporting the progress."""
+
+    def __init__(self, fp, progress):
+        self._fp = fp
+        self._progress = progress
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        chunk = self._fp.read(size)
+        if chunk and self._progress is not None:
+            self._progress.advance(len(chunk))
+        return chunk
+
+    def fileno(self):
+        # lets aiohttp figure out the content length
+        return self._fp.fileno()
 
-class MaybeUnlock:
-    def __init__(self, lock):
-        self.lock = lock
-        self._unlock = True
+    def tell(self):
+        return self._fp.tell()
 
-    def __enter__(self):
-        return self
+class _Upload:
+    __slots__ = ['fp', 'filename', 'start', 'size', 'used']
 
-    def defer(self):
-        self._unlock = False
+    def __init__(self, fp, filename):
+        if isinstance(fp, (bytes, bytearray, memoryview)):
+            fp = io.BytesIO(fp)
 
-    def __exit__(self, type, value, traceback):
-        if self._unlock:
-            self.lock.release()
+        self.fp = fp
+        self.filename = filename
+        self.used = False
+
+        try:
+            self.start = fp.tell()
+        except (AttributeError, OSError):
+            self.start = None
+
+        try:
+            self.size = os.fstat(fp.fileno()).st_size - self.start
+        except (AttributeError, OSError, TypeError):
+            try:
+                self.size = len(fp.getbuffer()) - self.start
+            except (AttributeError, TypeError):
+                self.size = None
+
+    def open(self, progress):
+        if self.used:
+            # a retry, so the file has to be read from the start again
+            if self.start is None:
+                raise ClientException('Cannot retry an upload from a file that is not seekable.')
+            self.fp.seek(self.start)
+
+        self.used = True
+        return _UploadReader(self.fp, progress)
+
+class _UploadProgress:
+    __slots__ = ['callback', 'total', 'sent']
+
+    def __init__(self, callback, total):
+        self.callback = callback
+        self.total = total
+        self.sent = 0
+
+    def advance(self, amount):
+        self.sent += amount
+        self.callback(self.sent, self.total)
+
+PoolStats = namedtuple('PoolStats', 'open_connections idle_connections acquired created reused reuse_ratio acquire_time')
+
+class PooledConnector(aiohttp.TCPConnector):
+    """A :class:`aiohttp.TCPConnector` tuned for making a lot of requests to a
+    single host, which keeps statistics about its connection pool.
+
+    Parameters
+    -----------
+    tcp_nodelay : bool
+        Whether to disable Nagle's algorithm on the created sockets.
+    dns_cache_ttl : Optional[float]
+        The number of seconds resolved hosts are cached for. ``None`` caches them forever.
+
+    The remaining keyword arguments are passed to :class:`aiohttp.TCPConnector`.
+    """
+
+    def __init__(self, *, tcp_nodelay=True, dns_cache_ttl=None, loop=None, **kwargs):
+        super().__init__(loop=loop, **kwargs)
+        self.tcp_nodelay = tcp_nodelay
+        self.dns_cache_ttl = dns_cache_ttl
+        self.acquired = 0
+        self.created = 0
+        self.acquire_time = 0.0
+        self._dns_handle = None
+        if dns_cache_ttl is not None:
+            self._schedule_dns_clear()
+
+    def _schedule_dns_clear(self):
+        self._dns_handle = self._loop.call_later(self.dns_cache_ttl, self._clear_dns)
+
+    def _clear_dns(self):
+        self.clear_dns_cache()
+        self._schedule_dns_clear()
+
+    @asyncio.coroutine
+    def connect(self, req):
+        start = self._loop.time()
+        try:
+            conn = yield from super().connect(req)
+        finally:
+            self.acquire_time += self._loop.time() - start
+
+        # failed attempts would skew the reuse ratio
+        self.acquired += 1
+        return conn
+
+    @asyncio.coroutine
+    def _create_connection(self, req):
+        transport, proto = yield from super()._create_connection(req)
+        self.created += 1
+        if self.tcp_nodelay:
+            sock = transport.get_extra_info('socket')
+            if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+                try:
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                except OSError:
+                    pass
+        return transport, proto
+
+    def close(self):
+        if self._dns_handle is not None:
+            self._dns_handle.cancel()
+            self._dns_handle = None
+        return super().close()
+
+    def stats(self):
+        idle = sum(len(conns) for conns in getattr(self, '_conns', {}).values())
+        in_use = getattr(self, '_acquired', ())
+        if isinstance(in_use, dict):
+            in_use = sum(len(conns) for conns in in_use.values())
+        else:
+            in_use = len(in_use)
+
+        reused = max(self.acquired - self.created, 0)
+        ratio = reused / self.acquired if self.acquired else 0.0
+        return PoolStats(open_connections=idle + in_use, idle_connections=idle, acquired=self.acquired,
+                         created=self.created, reused=reused, reuse_ratio=ratio, acquire_time=self.acquire_time)
 
 class HTTPClient:
     """Represents an HTTP client sending HTTP requests to the Discord API."""
@@ -87,38 +238,193 @@ class HTTPClient:
     SUCCESS_LOG = '{method} {url} has received {text}'
     REQUEST_LOG = '{method} {url} with {json} has returned {status}'
 
-    def __init__(self, connector=None, *, loop=None):
+    def __init__(self, connector=None, *, loop=None, max_concurrency=50, priority_limits=None,
+                       response_cache=False, response_cache_size=1000, response_cache_ttls=None,
+                       pool_size=20, keepalive_timeout=30.0, dns_cache_ttl=None, tcp_nodelay=True,
+                       ratelimit_socket=None, retry_policy=None, circuit_breaker_threshold=5,
+                       circuit_breaker_timeout=30.0):
         self.loop = asyncio.get_event_loop() if loop is None else loop
+        self.response_cache = None
+        if response_cache:
+            self.response_cache = ResponseCache(loop=self.loop, max_size=response_cache_size, ttls=response_cache_ttls)
+        self.scheduler = RequestScheduler(loop=self.loop, max_concurrency=max_concurrency, limits=priority_limits)
+        self._task_priorities = weakref.WeakKeyDictionary()
+
+        # single-flight state for identical GET requests
+        self._inflight = {}
+        self.coalesce_requests = True
+        self.coalesce_exclude = set()
+        self.coalesced_requests = 0
         self.connector = connector
-        self.session = aiohttp.ClientSession(connector=connector, loop=self.loop)
-        self._locks = weakref.WeakValueDictionary()
+        self._pool_options = {
+            'limit': pool_size,
+            'keepalive_timeout': keepalive_timeout,
+            'dns_cache_ttl': dns_cache_ttl,
+            'tcp_nodelay': tcp_nodelay,
+        }
+        self.session = aiohttp.ClientSession(connector=self._make_connector(), loop=self.loop)
+        self._buckets = {}
+        self._evict_at = BUCKET_EVICTION_THRESHOLD
         self._global_over = asyncio.Event(loop=self.loop)
         self._global_over.set()
+        self.retry_policy = RetryPolicy() if retry_policy is None else retry_policy
+        self.circuit_breaker_threshold = circuit_breaker_threshold
+        self.circuit_breaker_timeout = circuit_breaker_timeout
+        # (method, path) -> CircuitBreaker
+        self._breakers = {}
+        self.metrics = HTTPMetrics()
+        # called with the RequestInfo of every finished request
+        self.on_request = None
+        # called with a channel ID, returns the ID of its server or None
+        self.resolve_guild = None
+        self.shared_ratelimiter = None
+        if ratelimit_socket is not None:
+            self.shared_ratelimiter = SharedRateLimiter(ratelimit_socket, loop=self.loop)
         self.token = None
         self.bot_token = False
 
         user_agent = 'DiscordBot (https://github.com/Rapptz/discord.py {0}) Python/{1[0]}.{1[1]} aiohttp/{2}'
         self.user_agent = user_agent.format(__version__, sys.version_info, aiohttp.__version__)
+        self._base_headers = self._build_headers()
+
+    @contextlib.contextmanager
+    def use_priority(self, priority):
+        """A context manager that sets the default :class:`RequestPriority`
+        of the requests made by the current task."""
+        task = compat.current_task(loop=self.loop)
+        previous = self._task_priorities.get(task)
+        self._task_priorities[task] = priority
+        try:
+            yield
+        finally:
+            if previous is None:
+                self._task_priorities.pop(task, None)
+            else:
+                self._task_priorities[task] = previous
+
+    def _current_priority(self):
+        task = compat.current_task(loop=self.loop)
+        if task is None:
+            return RequestPriority.normal
+        return self._task_priorities.get(task, RequestPriority.normal)
+
+    def _should_coalesce(self, route, kwargs):
+        return (self.coalesce_requests and route.method == 'GET' and route.path not in self.coalesce_exclude and
+                'data' not in kwargs and 'json' not in kwargs and 'form' not in kwargs)
+
+    @asyncio.coroutine
+    def request(self, route, *, coalesce=True, **kwargs):
+        """|coro|
+
+        Makes a request to the given :class:`Route`.
+
+        If :attr:`response_cache` is enabled, cacheable GET requests are answered
+        from it while they are fresh, and other requests drop the entries they
+        may have changed.
+
+        Identical GET requests that are made while one of them is still in flight
+        share that request and its response rather than each making their own.
+        This can be disabled for a single call by passing ``coalesce=False``, for a
+        route by adding its path to :attr:`coalesce_exclude` or entirely by setting
+        :attr:`coalesce_requests` to ``False``. The number of requests that were
+        served this way is kept in :attr:`coalesced_requests`.
+        """
+        cache = self.response_cache
+        cacheable = cache is not None and cache.is_cacheable(route)
+        if cacheable:
+            data = cache.get(route, kwargs.get('params'))
+            if data is not _MISSING:
+                return data
+
+        # resolved here, a coalesced request runs in a task of its own
+        if kwargs.get('priority') is None:
+            kwargs['priority'] = self._current_priority()
+
+        if coalesce and self._should_coalesce(route, kwargs):
+            data = yield from self._coalesced_request(route, **kwargs)
+        else:
+            data = yield from self._request(route, **kwargs)
+
+        if cacheable:
+            cache.put(route, kwargs.get('params'), data)
+        elif cache is not None:
+            cache.invalidate(route)
+
+        return data
+
+    @asyncio.coroutine
+    def _coalesced_request(self, route, **kwargs):
+        params = kwargs.get('params')
+        key = (route.url, tuple(sorted(params.items())) if params else None)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced_requests += 1
+            data = yield from asyncio.shield(future, loop=self.loop)
+            # the callers could modify the response so they each get their own
+            return copy.deepcopy(data)
+
+        future = compat.create_task(self._request(route, **kwargs), loop=self.loop)
+        self._inflight[key] = future
+        future.add_done_callback(lambda f: self._inflight.get(key) is f and self._inflight.pop(key))
+        return (yield from asyncio.shield(future, loop=self.loop))
+
+    def _get_bucket(self, key):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            # a bucket per channel and route adds up, forget the ones not in use
+            if len(self._buckets) >= self._evict_at:
+                left = evict_idle_buckets(self._buckets)
+                self._evict_at = max(BUCKET_EVICTION_THRESHOLD, left * 2)
+
+            bucket = RateLimitBucket(key, loop=self.loop)
+            self._buckets[key] = bucket
+        return bucket
+
+    def _get_breaker(self, route):
+        if self.circuit_breaker_threshold is None:
+            return None
+
+        key = (route.method, route.path)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(key, loop=self.loop, failure_threshold=self.circuit_breaker_threshold,
+                                     recovery_timeout=self.circuit_breaker_timeout)
+            self._breakers[key] = breaker
+        return breaker
+
+    def _can_retry(self, breaker, attempt, elapsed, delay):
+        if breaker is not None and breaker.state == CircuitBreaker.OPEN:
+            return False
+        return self.retry_policy.can_retry(attempt, elapsed, delay)
 
     @asyncio.coroutine
-    def request(self, route, *, header_bypass_delay=None, **kwargs):
-        bucket = route.bucket
+    def _retry_sleep(self, delay, info):
+        slept_at = self.loop.time()
+        yield from asyncio.sleep(delay, loop=self.loop)
+        info.retry_wait += self.loop.time() - slept_at
+
+    @asyncio.coroutine
+    def _request(self, route, *, header_bypass_delay=None, priority=None, **kwargs):
+        key = route.bucket
         method = route.method
         url = route.url
 
-        lock = self._locks.get(bucket)
-        if lock is None:
-            lock = asyncio.Lock(loop=self.loop)
-            if bucket is not None:
-                self._locks[bucket] = lock
+        if priority is None:
+            priority = self._current_priority()
 
-        # header creation
-        headers = {
-            'User-Agent': self.user_agent,
-        }
+        # requests are queued fairly between servers, channel routes
+        # don't carry the server so it's looked up
+        fairness_key = route.guild_id
+        if fairness_key is None and route.channel_id is not None:
+            if self.resolve_guild is not None:
+                fairness_key = self.resolve_guild(route.channel_id)
+            if fairness_key is None:
+                fairness_key = route.channel_id
 
-        if self.token is not None:
-            headers['Authorization'] = 'Bot ' + self.token if self.bot_token else self.token
+        bucket = self._get_bucket(key)
+
+        # header creation
+        headers = self._base_headers.copy()
 
         # some checking if it's a JSON request
         if 'json' in kwargs:
@@ -126,81 +432,181 @@ class HTTPClient:
             kwargs['data'] = utils.to_json(kwargs.pop('json'))
 
         kwargs['headers'] = headers
+        form = kwargs.pop('form', None)
 
-        if not self._global_over.is_set():
-            # wait until the global lock is complete
-            yield from self._global_over.wait()
+        info = RequestInfo(route)
+        clock = self.loop.time
+        start = clock()
+        failed = True
 
-        yield from lock
-        with MaybeUnlock(lock) as maybe_lock:
-            for tries in range(5):
-                r = yield from self.session.request(method, url, **kwargs)
-                log.debug(self.REQUEST_LOG.format(method=method, url=url, status=r.status, json=kwargs.get('data')))
+        # fail fast instead of queueing up while the API is failing for this route
+        policy = self.retry_policy
+        breaker = self._get_breaker(route)
+        probe = breaker is not None and breaker.before_request()
+
+        acquired = False
+        try:
+            if not self._global_over.is_set():
+                # wait until the global lock is complete
+                yield from self._global_over.wait()
+                info.global_wait = clock() - start
+
+            # a coordinator shared with other processes takes precedence over the
+            # local bucket but the local one is used whenever it can't be reached
+            shared = self.shared_ratelimiter
+            if shared is not None:
+                shared_acquired = yield from shared.acquire(key, priority)
+                if not shared_acquired:
+                    shared = None
+
+            if shared is None:
+                yield from bucket.acquire(priority)
+            acquired = True
+        finally:
+            if probe and not acquired:
+                # cancelled while waiting, the probe has to be handed on
+                breaker.record(None, probe)
+
+        info.bucket_wait = clock() - start - info.global_wait
+
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                if form is not None:
+                    kwargs['data'] = form()
+
+                queued_at = clock()
+                yield from self.scheduler.acquire(priority, fairness_key)
+                sent_at = clock()
+                sent_time = time.time()
+                info.queue_wait += sent_at - queued_at
+                info.attempts += 1
                 try:
-                    # even errors have text involved in them so this is safe to call
-                    data = yield from json_or_text(r)
-
-                    # check if we have rate limit header information
-                    remaining = r.headers.get('X-Ratelimit-Remaining')
-                    if remaining == '0' and r.status != 429:
-                        # we've depleted our current bucket
-                        if header_bypass_delay is None:
-                            now = parsedate_to_datetime(r.headers['Date'])
-                            reset = datetime.datetime.fromtimestamp(int(r.headers['X-Ratelimit-Reset']), datetime.timezone.utc)
-                            delta = (reset - now).total_seconds()
-                        else:
-                            delta = header_bypass_delay
-
-                        fmt = 'A rate limit bucket has been exhausted (bucket: {bucket}, retry: {delta}).'
-                        log.info(fmt.format(bucket=bucket, delta=delta))
-                        maybe_lock.defer()
-                        self.loop.call_later(delta, lock.release)
-
-                    # the request was successful so just return the text/json
-                    if 300 > r.status >= 200:
-                        log.debug(self.SUCCESS_LOG.format(method=method, url=url, text=data))
-                        return data
-
-                    # we are being rate limited
-                    if r.status == 429:
-                        fmt = 'We are being rate limited. Retrying in {:.2} seconds. Handled under the bucket "{}"'
-
-                        # sleep a bit
-                        retry_after = data['retry_after'] / 1000.0
-                        log.info(fmt.format(retry_after, bucket))
-
-                        # check if it's a global rate limit
-                        is_global = data.get('global', False)
-                        if is_global:
-                            log.info('Global rate limit has been hit. Retrying in {:.2} seconds.'.format(retry_after))
-                            self._global_over.clear()
-
-                        yield from asyncio.sleep(retry_after, loop=self.loop)
-                        log.debug('Done sleeping for the rate limit. Retrying...')
-
-                        # release the global lock now that the
-                        # global rate limit has passed
-                        if is_global:
-                            self._global_over.set()
-                            log.debug('Global rate limit is now over.')
+                    r = yield from self.session.request(method, url, **kwargs)
+                    try:
+                        # even errors have text involved in them so this is safe to call
+                        data = yield from json_or_text(r)
+                    finally:
+                        # clean-up just in case
+                        yield from r.release()
+                except policy.exceptions as e:
+                    if breaker is not None:
+                        breaker.record(False, probe)
+                        probe = False
+
+                    if not policy.retries_exception(e, method):
+                        raise
+
+                    delay = policy.backoff(attempt)
+                    if not self._can_retry(breaker, attempt, clock() - start, delay):
+                        raise
+
+                    fmt = '{} {} has failed with {!r}. Retrying in {:.2f} seconds.'
+                    log.warning(fmt.format(method, url, e, delay))
+                    r = None
+                finally:
+                    self.scheduler.release(priority)
+                    info.network += clock() - sent_at
 
-                        continue
+                if r is None:
+                    yield from self._retry_sleep(delay, info)
+                    continue
 
-                    # we've received a 502, unconditional retry
-                    if r.status == 502 and tries <= 5:
-                        yield from asyncio.sleep(1 + tries * 2, loop=self.loop)
-                        continue
+                info.status = r.status
+                if r.status >= 500:
+                    info.server_errors += 1
+
+                if breaker is not None:
+                    # any answer that isn't a server error means the API is up
+                    breaker.record(r.status < 500, probe)
+                    probe = False
+
+                log.debug(self.REQUEST_LOG.format(method=method, url=url, status=r.status, json=kwargs.get('data')))
 
-                    # the usual error cases
-                    if r.status == 403:
-                        raise Forbidden(r, data)
-                    elif r.status == 404:
-                        raise NotFound(r, data)
+                # check if we have rate limit header information
+                if r.status != 429:
+                    parsed = RateLimitBucket.parse_headers(r.headers, header_bypass_delay, sent_time)
+                    if parsed is not None:
+                        bucket.apply(*parsed)
+                        if shared is not None:
+                            shared.update(key, *parsed)
+
+                # the request was successful so just return the text/json
+                if 300 > r.status >= 200:
+                    log.debug(self.SUCCESS_LOG.format(method=method, url=url, text=data))
+                    failed = False
+                    return data
+
+                # we are being rate limited
+                if r.status == 429 and attempt < policy.max_attempts:
+                    fmt = 'We are being rate limited. Retrying in {:.2} seconds. Handled under the bucket "{}"'
+
+                    # sleep a bit
+                    retry_after = data['retry_after'] / 1000.0
+                    log.info(fmt.format(retry_after, key))
+
+                    # check if it's a global rate limit
+                    info.rate_limited += 1
+                    is_global = data.get('global', False)
+                    if is_global:
+                        log.info('Global rate limit has been hit. Retrying in {:.2} seconds.'.format(retry_after))
+                        self.metrics.global_rate_limits += 1
+                        self._global_over.clear()
+                        if shared is not None:
+                            shared.global_limit(retry_after)
                     else:
-                        raise HTTPException(r, data)
-                finally:
-                    # clean-up just in case
-                    yield from r.release()
+                        # hold off the other requests in this bucket as well
+                        bucket.exhaust(retry_after)
+                        if shared is not None:
+                            shared.exhaust(key, retry_after)
+
+                    slept_at = clock()
+                    yield from asyncio.sleep(retry_after, loop=self.loop)
+                    log.debug('Done sleeping for the rate limit. Retrying...')
+                    if is_global:
+                        info.global_wait += clock() - slept_at
+                    else:
+                        info.rate_limit_wait += clock() - slept_at
+
+                    # release the global lock now that the
+                    # global rate limit has passed
+                    if is_global:
+                        self._global_over.set()
+                        log.debug('Global rate limit is now over.')
+
+                    continue
+
+                # server errors are retried with an increasing delay
+                if policy.retries_status(r.status):
+                    delay = policy.backoff(attempt)
+                    if self._can_retry(breaker, attempt, clock() - start, delay):
+                        fmt = '{} {} has returned {}. Retrying in {:.2f} seconds.'
+                        log.info(fmt.format(method, url, r.status, delay))
+                        yield from self._retry_sleep(delay, info)
+                        continue
+
+                # the usual error cases
+                if r.status == 403:
+                    raise Forbidden(r, data)
+                elif r.status == 404:
+                    raise NotFound(r, data)
+                else:
+                    raise HTTPException(r, data)
+        finally:
+            if probe:
+                # the probe ended without telling whether the API recovered
+                breaker.record(None, probe)
+
+            if shared is not None:
+                shared.release(key)
+            else:
+                bucket.release()
+
+            info.total = clock() - start
+            self.metrics.record(info, error=failed)
+            if self.on_request is not None:
+                self.on_request(info)
 
     def get(self, *args, **kwargs):
         return self.request('GET', *args, **kwargs)
@@ -219,16 +625,54 @@ class HTTPClient:
 
     # state management
 
+    def _make_connector(self):
+        if self.connector is not None:
+            return self.connector
+        return PooledConnector(loop=self.loop, **self._pool_options)
+
+    def pool_stats(self):
+        """Returns a ``PoolStats`` namedtuple describing the connection pool.
+
+        It holds the number of ``open_connections`` and ``idle_connections``, how many
+        connections were ``acquired`` in total and how many of those were freshly
+        ``created`` or ``reused``, the ``reuse_ratio`` and the total ``acquire_time``
+        in seconds spent waiting for a connection.
+
+        Returns ``None`` if a custom connector was passed in.
+        """
+        connector = self.session.connector
+        if isinstance(connector, PooledConnector):
+            return connector.stats()
+        return None
+
     @asyncio.coroutine
     def close(self):
+        if self.shared_ratelimiter is not None:
+            self.shared_ratelimiter.close()
         yield from self.session.close()
 
     def recreate(self):
-        self.session = aiohttp.ClientSession(connector=self.connector, loop=self.loop)
+        # keep the current session and its warm connection pool if it's still usable
+        if not self.session.closed:
+            return
+        self.session = aiohttp.ClientSession(connector=self._make_connector(), loop=self.loop)
+
+    def _build_headers(self):
+        headers = {
+            'User-Agent': self.user_agent,
+            'X-RateLimit-Precision': 'millisecond',
+        }
+
+        if self.token is not None:
+            headers['Authorization'] = 'Bot ' + self.token if self.bot_token else self.token
+        return headers
 
     def _token(self, token, *, bot=True):
         self.token = token
         self.bot_token = bot
+        self._base_headers = self._build_headers()
+        if self.shared_ratelimiter is not None:
+            self.shared_ratelimiter.set_token(token)
 
     # login management
 
@@ -278,7 +722,7 @@ class HTTPClient:
 
     # TODO: remove guild_id parameters here
 
-    def send_message(self, channel_id, content, *, guild_id=None, tts=False, embed=None):
+    def send_message(self, channel_id, content, *, guild_id=None, tts=False, embed=None, priority=None):
         r = Route('POST', '/channels/{channel_id}/messages', channel_id=channel_id)
         payload = {}
 
@@ -291,14 +735,18 @@ class HTTPClient:
         if embed:
             payload['embed'] = embed
 
-        return self.request(r, json=payload)
+        return self.request(r, json=payload, priority=priority)
 
     def send_typing(self, channel_id):
         return self.request(Route('POST', '/channels/{channel_id}/typing', channel_id=channel_id))
 
-    def send_file(self, channel_id, buffer, *, guild_id=None, filename=None, content=None, tts=False, embed=None):
+    def send_file(self, channel_id, buffer, *, guild_id=None, filename=None, content=None, tts=False, embed=None,
+                  priority=None, progress=None):
+        return self.send_files(channel_id, [(buffer, filename)], content=content, tts=tts, embed=embed,
+                               priority=priority, progress=progress)
+
+    def send_files(self, channel_id, files, *, content=None, tts=False, embed=None, priority=None, progress=None):
         r = Route('POST', '/channels/{channel_id}/messages', channel_id=channel_id)
-        form = aiohttp.FormData()
 
         payload = {'tts': tts}
         if content:
@@ -306,10 +754,27 @@ class HTTPClient:
         if embed:
             payload['embed'] = embed
 
-        form.add_field('payload_json', utils.to_json(payload))
-        form.add_field('file', buffer, filename=filename, content_type='application/octet-stream')
+        uploads = [_Upload(fp, filename) for fp, filename in files]
+        tracker = None
+        if progress is not None:
+            sizes = [upload.size for upload in uploads]
+            tracker = _UploadProgress(progress, None if None in sizes else sum(sizes))
+
+        # the files are streamed rather than read into memory, so every
+        # attempt needs a fresh form that starts reading from the beginning
+        def form():
+            if tracker is not None:
+                tracker.sent = 0
 
-        return self.request(r, data=form)
+            form = aiohttp.FormData()
+            form.add_field('payload_json', utils.to_json(payload))
+            for index, upload in enumerate(uploads):
+                name = 'file' if len(uploads) == 1 else 'file{}'.format(index)
+                form.add_field(name, upload.open(tracker), filename=upload.filename,
+                               content_type='application/octet-stream')
+            return form
+
+        return self.request(r, form=form, priority=priority)
 
     def delete_message(self, channel_id, message_id, guild_id=None):
         r = Route('DELETE', '/channels/{channel_id}/messages/{message_id}', channel_id=channel_id,
@@ -393,6 +858,14 @@ class HTTPClient:
 
     # Member management
 
+    def get_members(self, guild_id, limit, after=None):
+        params = {'limit': limit}
+        if after:
+            params['after'] = after
+
+        r = Route('GET', '/guilds/{guild_id}/members', guild_id=guild_id)
+        return self.request(r, params=params)
+
     def kick(self, user_id, guild_id):
         r = Route('DELETE', '/guilds/{guild_id}/members/{user_id}', guild_id=guild_id, user_id=user_id)
         return self.request(r)
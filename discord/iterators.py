@@ -27,13 +27,159 @@ DEALINGS IN THE SOFTWARE.
 import sys
 import asyncio
 import aiohttp
+import weakref
+from collections import deque, namedtuple
 from .message import Message
 from .object import Object
+from .user import User
+from . import compat
 
 PY35 = sys.version_info >= (3, 5)
 
+MemberRecord = namedtuple('MemberRecord', 'id name discriminator avatar bot nick roles joined_at deaf mute')
 
-class LogsFromIterator:
+
+class _PagedIterator:
+    """Base for the iterators over paginated endpoints.
+
+    Subclasses implement ``_fetch_page``, which returns the next page as a
+    list and sets ``_done`` once there are no more pages. With a ``prefetch``
+    depth, a background task keeps up to that many pages fetched ahead.
+    """
+
+    def _init_paging(self, loop, prefetch):
+        self.loop = loop
+        self.prefetch = prefetch
+        self._buffer = deque()
+        self._done = False
+        self._pages = None  # asyncio.Queue of prefetched pages
+        self._producer = None
+
+    @asyncio.coroutine
+    def iterate(self):
+        if not self._buffer:
+            self._buffer.extend((yield from self._next_page()))
+
+        try:
+            return self._buffer.popleft()
+        except IndexError:
+            raise asyncio.QueueEmpty() from None
+
+    @asyncio.coroutine
+    def next_page(self):
+        """|coro|
+
+        Returns the next page as a list, in the same order as the iterator
+        would return the items. Items already retrieved through :meth:`iterate`
+        but not returned yet are part of the page.
+
+        An empty list is returned once there are no more items.
+        """
+        if self._buffer:
+            page = list(self._buffer)
+            self._buffer.clear()
+            return page
+
+        return (yield from self._next_page())
+
+    def pages(self):
+        """Returns an iterator over the pages, each of which is a list.
+
+        Python 3.5 Usage ::
+
+            async for page in client.logs_from(channel, limit=5000, prefetch=2).pages():
+                archive.extend(page)
+        """
+        return _PageIterator(self)
+
+    def close(self):
+        """Stops fetching pages in the background.
+
+        Calls waiting for the next page return an empty one. An iterator
+        that is dropped without being closed stops fetching once it is
+        garbage collected.
+        """
+        self._done = True
+        if self._producer is not None:
+            self._producer.cancel()
+            self._producer = None
+
+        if self._pages is not None:
+            # wake up whoever is waiting for the next page
+            while not self._pages.empty():
+                self._pages.get_nowait()
+            self._pages.put_nowait(None)
+
+    @asyncio.coroutine
+    def _next_page(self):
+        # a page can be emptied by a filter, so skip those until we're done
+        while True:
+            if self.prefetch > 0:
+                if self._pages is None:
+                    self._pages = asyncio.Queue(maxsize=self.prefetch, loop=self.loop)
+                    producer = _produce_pages(weakref.ref(self), self._pages)
+                    self._producer = compat.create_task(producer, loop=self.loop)
+                    weakref.finalize(self, self._producer.cancel)
+
+                if self._producer is None and self._pages.empty():
+                    return []
+
+                page = yield from self._pages.get()
+                if page is None:
+                    self._producer = None
+                    return []
+                if isinstance(page, Exception):
+                    self._producer = None
+                    raise page
+            elif self._done:
+                return []
+            else:
+                page = yield from self._fetch_page()
+
+            if page:
+                return page
+
+    @asyncio.coroutine
+    def _fetch_page(self):
+        """Retrieve the next page and update the paging parameters."""
+        pass
+
+    if PY35:
+        @asyncio.coroutine
+        def __aiter__(self):
+            return self
+
+        @asyncio.coroutine
+        def __anext__(self):
+            try:
+                return (yield from self.iterate())
+            except asyncio.QueueEmpty:
+                # if we're still empty at this point...
+                # we didn't get anything new so stop looping
+                raise StopAsyncIteration()
+
+@asyncio.coroutine
+def _produce_pages(ref, pages):
+    # the iterator is only referenced while a page is fetched, so one that
+    # is dropped without being closed can be collected, which cancels this
+    try:
+        while True:
+            iterator = ref()
+            if iterator is None or iterator._done:
+                break
+
+            fetch = iterator._fetch_page()
+            del iterator
+            page = yield from fetch
+            yield from pages.put(page)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        yield from pages.put(e)
+    else:
+        yield from pages.put(None)
+
+class LogsFromIterator(_PagedIterator):
     """Iterator for recieving logs.
 
     The messages endpoint has two behaviors we care about here:
@@ -67,10 +213,20 @@ class LogsFromIterator:
         If set to true, return messages in oldest->newest order. Recommended
         when using with "after" queries with limit over 100, otherwise messages
         will be out of order. Defaults to False for backwards compatability.
+    prefetch : int
+        The number of pages of 100 messages to fetch ahead in the background
+        while the current page is being consumed. Defaults to 0, which only
+        fetches a page once the previous one is used up.
+
+    Attributes
+    -----------
+    messages : collections.deque
+        The messages that have been fetched but not returned yet. This used
+        to be an :class:`asyncio.Queue`.
     """
 
     def __init__(self, client, channel, limit,
-                 before=None, after=None, around=None, reverse=False):
+                 before=None, after=None, around=None, reverse=False, prefetch=0):
         self.client = client
         self.connection = client.connection
         self.channel = channel
@@ -80,7 +236,8 @@ class LogsFromIterator:
         self.around = around
         self.reverse = reverse
         self._filter = None  # message dict -> bool
-        self.messages = asyncio.Queue()
+        self._init_paging(client.loop, prefetch)
+        self.messages = self._buffer
 
         if self.around:
             if self.limit > 101:
@@ -110,25 +267,28 @@ class LogsFromIterator:
             self._retrieve_messages = self._retrieve_messages_before_strategy
 
     @asyncio.coroutine
-    def iterate(self):
-        if self.messages.empty():
-            yield from self.fill_messages()
-
-        return self.messages.get_nowait()
+    def fill_messages(self):
+        page = yield from self._next_page()
+        self.messages.extend(page)
 
     @asyncio.coroutine
-    def fill_messages(self):
-        if self.limit > 0:
-            retrieve = self.limit if self.limit <= 100 else 100
-            data = yield from self._retrieve_messages(retrieve)
-            if self.reverse:
-                data = reversed(data)
-            if self._filter:
-                data = filter(self._filter, data)
-            for element in data:
-                yield from self.messages.put(
-                    self.connection._create_message(
-                        channel=self.channel, **element))
+    def _fetch_page(self):
+        if self.limit <= 0:
+            self._done = True
+            return []
+
+        retrieve = self.limit if self.limit <= 100 else 100
+        data = yield from self._retrieve_messages(retrieve)
+        if not data or self.limit <= 0:
+            self._done = True
+
+        if self.reverse:
+            data = reversed(data)
+        if self._filter:
+            data = filter(self._filter, data)
+
+        create = self.connection._create_message
+        return [create(channel=self.channel, **element) for element in data]
 
     @asyncio.coroutine
     def _retrieve_messages(self, retrieve):
@@ -162,6 +322,129 @@ class LogsFromIterator:
             return data
         return []
 
+class ReactionUsersIterator(_PagedIterator):
+    """Iterator over the users that added a reaction to a message.
+
+    The endpoint returns up to 100 users at a time sorted by ID, so pages
+    are requested with ``after`` set to the last user received.
+
+    Parameters
+    -----------
+    client : class:`Client`
+    message_id : str
+        The ID of the message the reaction is on.
+    channel_id : str
+        The ID of the channel the message is in.
+    emoji : str
+        The emoji of the reaction, formatted for the API.
+    limit : Optional[int]
+        Maximum number of users to retrieve. ``None`` retrieves all of them.
+    after : Optional[str]
+        The ID of the user after which to start.
+    ids_only : bool
+        If set to true, user IDs are returned instead of :class:`User` objects,
+        which skips creating the objects entirely.
+    prefetch : int
+        The number of pages of 100 users to fetch ahead in the background.
+    """
+
+    def __init__(self, client, message_id, channel_id, emoji, *, limit=None, after=None, ids_only=False, prefetch=0):
+        self.http = client.http
+        self.message_id = message_id
+        self.channel_id = channel_id
+        self.emoji = emoji
+        self.limit = limit
+        self.after = after
+        self.ids_only = ids_only
+        self._init_paging(client.loop, prefetch)
+
+    @asyncio.coroutine
+    def _fetch_page(self):
+        retrieve = 100 if self.limit is None else min(self.limit, 100)
+        if retrieve <= 0:
+            self._done = True
+            return []
+
+        data = yield from self.http.get_reaction_users(self.message_id, self.channel_id, self.emoji,
+                                                       retrieve, after=self.after)
+        if self.limit is not None:
+            self.limit -= len(data)
+        if len(data) < retrieve or self.limit == 0:
+            self._done = True
+        if data:
+            self.after = data[-1]['id']
+
+        if self.ids_only:
+            return [user['id'] for user in data]
+        return [User(**user) for user in data]
+
+class MemberListIterator(_PagedIterator):
+    """Iterator over the members of a server through the REST API.
+
+    Members are returned as :class:`MemberRecord` tuples sorted by ID and are
+    not added to the server's member cache, so a server of any size can be
+    streamed in constant memory.
+
+    Parameters
+    -----------
+    client : class:`Client`
+    guild_id : str
+        The ID of the server.
+    limit : Optional[int]
+        Maximum number of members to retrieve. ``None`` retrieves all of them.
+    after : Optional[str]
+        The ID of the user after which to start.
+    prefetch : int
+        The number of pages of 1000 members to fetch ahead in the background.
+    """
+
+    PAGE_SIZE = 1000
+
+    def __init__(self, client, guild_id, *, limit=None, after=None, prefetch=0):
+        self.http = client.http
+        self.guild_id = guild_id
+        self.limit = limit
+        self.after = after
+        self._init_paging(client.loop, prefetch)
+
+    @asyncio.coroutine
+    def _fetch_page(self):
+        retrieve = self.PAGE_SIZE if self.limit is None else min(self.limit, self.PAGE_SIZE)
+        if retrieve <= 0:
+            self._done = True
+            return []
+
+        data = yield from self.http.get_members(self.guild_id, retrieve, after=self.after)
+        if self.limit is not None:
+            self.limit -= len(data)
+        if len(data) < retrieve or self.limit == 0:
+            self._done = True
+
+        records = []
+        for member in data:
+            user = member['user']
+            records.append(MemberRecord(id=user['id'], name=user.get('username'),
+                                        discriminator=user.get('discriminator'), avatar=user.get('avatar'),
+                                        bot=user.get('bot', False), nick=member.get('nick'),
+                                        roles=member.get('roles', []), joined_at=member.get('joined_at'),
+                                        deaf=member.get('deaf', False), mute=member.get('mute', False)))
+
+        if records:
+            self.after = records[-1].id
+        return records
+
+class _PageIterator:
+    def __init__(self, iterator):
+        self.iterator = iterator
+
+    @asyncio.coroutine
+    def next(self):
+        """|coro|
+
+        Returns the next page, or an empty list once there are no more items.
+        """
+        return (yield from self.iterator.next_page())
+
     if PY35:
         @asyncio.coroutine
         def __aiter__(self):
@@ -169,10 +452,7 @@ class LogsFromIterator:
 
         @asyncio.coroutine
         def __anext__(self):
-            try:
-                msg = yield from self.iterate()
-                return msg
-            except asyncio.QueueEmpty:
-                # if we're still empty at this point...
-                # we didn't get any new messages so stop looping
+            page = yield from self.iterator.next_page()
+            if not page:
                 raise StopAsyncIteration()
+            return page
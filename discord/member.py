@@ -67,10 +67,36 @@ class VoiceState:
         self.deaf = kwargs.get('deaf', False)
         self.voice_channel = kwargs.get('voice_channel')
 
+class _EmptyVoiceState(VoiceState):
+    """The voice state shared by every member that is not connected to voice.
+
+    Since most members are never in a voice channel, they all point to a
+    single instance of this rather than allocating their own. It is never
+    handed out, :attr:`Member.voice` gives the member a state of its own
+    the first time it's accessed so that it can be modified safely.
+    """
+
+    __slots__ = ()
+
+    def __init__(self):
+        for attr in VoiceState.__slots__:
+            object.__setattr__(self, attr, None if attr in ('session_id', 'voice_channel') else False)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('the voice state of a member not in voice cannot be modified')
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+EMPTY_VOICE_STATE = _EmptyVoiceState()
+
 def flatten_voice_states(cls):
     for attr in VoiceState.__slots__:
         def getter(self, x=attr):
-            return getattr(self.voice, x)
+            return getattr(self._voice, x)
         setattr(cls, attr, property(getter))
     return cls
 
@@ -103,11 +129,15 @@ class Member(User):
         The server specific nickname of the user.
     """
 
-    __slots__ = [ 'roles', 'joined_at', 'status', 'game', 'server', 'nick', 'voice' ]
+    __slots__ = [ 'roles', 'joined_at', 'status', 'game', 'server', 'nick', '_voice' ]
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs.get('user'))
-        self.voice = VoiceState(**kwargs)
+        if kwargs.get('voice_channel') is None and not (kwargs.get('mute') or kwargs.get('deaf')):
+            self._voice = EMPTY_VOICE_STATE
+        else:
+            self._voice = VoiceState(**kwargs)
+
         self.joined_at = utils.parse_time(kwargs.get('joined_at'))
         self.roles = kwargs.get('roles', [])
         self.status = Status.offline
@@ -116,34 +146,41 @@ class Member(User):
         self.server = kwargs.get('server', None)
         self.nick = kwargs.get('nick', None)
 
+    @property
+    def voice(self):
+        # members out of voice share the empty state until theirs is asked for
+        if self._voice is EMPTY_VOICE_STATE:
+            self._voice = VoiceState()
+        return self._voice
+
+    @voice.setter
+    def voice(self, value):
+        self._voice = value
+
     def _update_voice_state(self, **kwargs):
-        self.voice.self_mute = kwargs.get('self_mute', False)
-        self.voice.self_deaf = kwargs.get('self_deaf', False)
-        self.voice.is_afk = kwargs.get('suppress', False)
-        self.voice.mute = kwargs.get('mute', False)
-        self.voice.deaf = kwargs.get('deaf', False)
-        old_channel = getattr(self, 'voice_channel', None)
+        old_channel = self._voice.voice_channel
         vc = kwargs.get('voice_channel')
 
-        if old_channel is None and vc is not None:
-            # we joined a channel
-            vc.voice_members.append(self)
-        elif old_channel is not None:
-            try:
-                # we either left a channel or we switched channels
-                old_channel.voice_members.remove(self)
-            except ValueError:
-                pass
-            finally:
-                # we switched channels
-                if vc is not None:
-                    vc.voice_members.append(self)
-
-        self.voice.voice_channel = vc
+        # we either left a channel or we switched channels
+        if old_channel is not None and old_channel is not vc:
+            old_channel._remove_voice_member(self)
+
+        if vc is not None:
+            vc._add_voice_member(self)
+        elif not (kwargs.get('mute') or kwargs.get('deaf')):
+            # most members out of voice can share the empty state
+            self._voice = EMPTY_VOICE_STATE
+            return
+
+        if self._voice is EMPTY_VOICE_STATE:
+            self._voice = VoiceState(**kwargs)
+        else:
+            self._voice._update_voice_state(**kwargs)
 
     def _copy(self):
         ret = copy.copy(self)
-        ret.voice = copy.copy(self.voice)
+        if self._voice is not EMPTY_VOICE_STATE:
+            ret._voice = copy.copy(self._voice)
         return ret
 
     @property
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-2016 Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import array
+import datetime
+
+from .member import Member, EMPTY_VOICE_STATE
+from .enums import Status
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+class _MemberValues:
+    __slots__ = ['store']
+
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return len(self.store)
+
+    def __iter__(self):
+        store = self.store
+        for member_id in list(store._index):
+            member = store.get(member_id)
+            if member is not None:
+                yield member
+
+class ColumnarMemberStore:
+    """A column oriented storage for the members of a :class:`Server`.
+
+    Rather than keeping a :class:`Member` around for every member of the server,
+    the member data is spread over parallel arrays and :class:`Member` instances
+    are only built when they're requested. Members that are currently connected
+    to voice are kept as regular instances since they are referenced elsewhere.
+
+    This mimics the small subset of the ``dict`` interface that :class:`Server`
+    uses, so it can be used as a drop-in replacement for ``Server._members``.
+
+    Since the returned members are views, modifications to them are not persisted
+    until they are stored back through ``Server._add_member``. Holding on to one
+    of them gives a snapshot that does not see later updates, so look members
+    up again through :meth:`Server.get_member` rather than keeping them around.
+
+    Every role seen on a member takes up a bit of the role column. The bit is
+    given back when the role is deleted from the server, so the masks only grow
+    with the number of roles that exist at the same time.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self._index = {}
+        self._pinned = {}
+
+        self._ids = array.array('Q')
+        self._joined = array.array('d')
+        self._statuses = array.array('B')
+        self._roles = []
+        self._names = []
+        self._discriminators = []
+        self._avatars = []
+        self._bots = array.array('B')
+        self._nicks = []
+        self._games = []
+
+        # interning tables for the status and role columns
+        self._status_values = list(Status)
+        self._status_codes = { status: code for code, status in enumerate(self._status_values) }
+        self._role_bits = {}
+        self._bit_roles = []
+        self._free_bits = []
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, member_id):
+        return member_id in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def _status_code(self, status):
+        code = self._status_codes.get(status)
+        if code is None:
+            # a status not recognised by the enumerator
+            code = len(self._status_values)
+            self._status_values.append(status)
+            self._status_codes[status] = code
+        return code
+
+    def _role_mask(self, roles):
+        mask = 0
+        for role in roles:
+            if role.is_everyone:
+                continue
+
+            bit = self._role_bits.get(role.id)
+            if bit is None:
+                if self._free_bits:
+                    bit = self._free_bits.pop()
+                    self._bit_roles[bit] = role.id
+                else:
+                    bit = len(self._bit_roles)
+                    self._bit_roles.append(role.id)
+                self._role_bits[role.id] = bit
+            mask |= 1 << bit
+        return mask
+
+    def remove_role(self, role):
+        """Clears a deleted role from every member and frees its bit
+        so that a later role can reuse it."""
+        bit = self._role_bits.pop(role.id, None)
+        if bit is None:
+            return
+
+        self._bit_roles[bit] = None
+        self._free_bits.append(bit)
+
+        flag = 1 << bit
+        roles = self._roles
+        for row, mask in enumerate(roles):
+            if mask & flag:
+                roles[row] = mask & ~flag
+
+    def __setitem__(self, member_id, member):
+        voice = member._voice
+        if voice is EMPTY_VOICE_STATE or (voice.voice_channel is None and not (voice.mute or voice.deaf)):
+            self._pinned.pop(member_id, None)
+        else:
+            self._pinned[member_id] = member
+
+        joined = float('nan') if member.joined_at is None else (member.joined_at - _EPOCH).total_seconds()
+        status = self._status_code(member.status)
+        roles = self._role_mask(member.roles)
+
+        row = self._index.get(member_id)
+        if row is None:
+            self._index[member_id] = len(self._ids)
+            self._ids.append(int(member_id))
+            self._joined.append(joined)
+            self._statuses.append(status)
+            self._roles.append(roles)
+            self._names.append(member.name)
+            self._discriminators.append(member.discriminator)
+            self._avatars.append(member.avatar)
+            self._bots.append(bool(member.bot))
+            self._nicks.append(member.nick)
+            self._games.append(member.game)
+        else:
+            self._joined[row] = joined
+            self._statuses[row] = status
+            self._roles[row] = roles
+            self._names[row] = member.name
+            self._discriminators[row] = member.discriminator
+            self._avatars[row] = member.avatar
+            self._bots[row] = bool(member.bot)
+            self._nicks[row] = member.nick
+            self._games[row] = member.game
+
+    def pop(self, member_id, default=None):
+        row = self._index.pop(member_id, None)
+        if row is None:
+            return default
+
+        member = self._pinned.pop(member_id, None) or self._build(member_id, row)
+
+        # move the last row into the hole to keep the columns dense
+        last = len(self._ids) - 1
+        columns = (self._ids, self._joined, self._statuses, self._roles, self._names,
+                   self._discriminators, self._avatars, self._bots, self._nicks, self._games)
+        if row != last:
+            for column in columns:
+                column[row] = column[last]
+            self._index[str(self._ids[row])] = row
+
+        for column in columns:
+            column.pop()
+
+        return member
+
+    def get(self, member_id, default=None):
+        member = self._pinned.get(member_id)
+        if member is not None:
+            return member
+
+        row = self._index.get(member_id)
+        if row is None:
+            return default
+        return self._build(member_id, row)
+
+    def values(self):
+        return _MemberValues(self)
+
+    def _row_member(self, row):
+        return self.get(str(self._ids[row]))
+
+    def get_named(self, name):
+        """Does the lookup of :meth:`Server.get_member_named` over the name,
+        discriminator and nickname columns, only building the member that matches."""
+        names = self._names
+        if len(name) > 5 and name[-5] == '#':
+            username = name[:-5]
+            discriminator = name[-4:]
+            discriminators = self._discriminators
+            for row, value in enumerate(names):
+                if value == username and discriminators[row] == discriminator:
+                    return self._row_member(row)
+
+        for row, (value, nick) in enumerate(zip(names, self._nicks)):
+            if nick == name or value == name:
+                return self._row_member(row)
+        return None
+
+    def _build(self, member_id, row):
+        server = self.server
+        member = Member.__new__(Member)
+        member.id = member_id
+        member.name = self._names[row]
+        member.discriminator = self._discriminators[row]
+        member.avatar = self._avatars[row]
+        member.bot = bool(self._bots[row])
+        member.nick = self._nicks[row]
+        member.game = self._games[row]
+        member.server = server
+        member._voice = EMPTY_VOICE_STATE
+        member.status = self._status_values[self._statuses[row]]
+
+        joined = self._joined[row]
+        member.joined_at = None if joined != joined else _EPOCH + datetime.timedelta(seconds=joined)
+
+        roles = [server.default_role]
+        mask = self._roles[row]
+        if mask:
+            lookup = { role.id: role for role in server.roles }
+            bit = 0
+            while mask:
+                if mask & 1:
+                    role = lookup.get(self._bit_roles[bit])
+                    if role is not None:
+                        roles.append(role)
+                mask >>= 1
+                bit += 1
+            roles.sort()
+
+        member.roles = roles
+        return member
+
+    def count(self, *, status=None, role=None):
+        """Counts the members matching the given status and role without
+        building any :class:`Member`.
+
+        Parameters
+        -----------
+        status : Optional[:class:`Status`]
+            The status the members must have.
+        role : Optional[:class:`Role`]
+            The role the members must have.
+
+        Returns
+        --------
+        int
+            The number of matching members.
+        """
+
+        if role is not None and not role.is_everyone:
+            bit = self._role_bits.get(role.id)
+            if bit is None:
+                return 0
+            role_mask = 1 << bit
+        else:
+            role_mask = None
+
+        if status is not None:
+            code = self._status_codes.get(status)
+            if code is None:
+                return 0
+            if role_mask is None:
+                return self._statuses.count(code)
+            return sum(1 for s, r in zip(self._statuses, self._roles) if s == code and r & role_mask)
+
+        if role_mask is None:
+            return len(self._ids)
+        return sum(1 for r in self._roles if r & role_mask)
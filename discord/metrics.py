@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-2016 Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import bisect
+from collections import namedtuple
+
+HistogramSnapshot = namedtuple('HistogramSnapshot', 'count total buckets')
+RouteSnapshot = namedtuple('RouteSnapshot', 'requests retries rate_limited server_errors errors '
+                                            'total queue network rate_limit_wait retry_wait')
+
+class RequestInfo:
+    """Represents the timings of a single REST request, passed to :func:`on_http_request`.
+
+    A request covers every attempt made for a single API call, so the
+    timings include any retries that happened.
+
+    Attributes
+    -----------
+    method : str
+        The HTTP method of the request.
+    path : str
+        The route template of the request, e.g. ``/channels/{channel_id}/messages``.
+    url : str
+        The formatted URL of the request.
+    status : Optional[int]
+        The status code of the last response, or ``None`` if no response was received.
+    attempts : int
+        The number of times the request was sent.
+    total : float
+        The number of seconds from the call until it returned or raised.
+    global_wait : float
+        The number of seconds spent waiting for a global rate limit to be over
+        before the request could be sent.
+    bucket_wait : float
+        The number of seconds spent waiting for a slot in the rate limit bucket.
+    queue_wait : float
+        The number of seconds spent queued in the :class:`RequestPriority` scheduler.
+    network : float
+        The number of seconds spent sending the request and reading the response.
+    rate_limit_wait : float
+        The number of seconds spent sleeping after receiving 429 responses.
+    retry_wait : float
+        The number of seconds spent sleeping before retrying failed requests.
+    rate_limited : int
+        The number of 429 responses received.
+    server_errors : int
+        The number of 5xx responses received.
+    """
+
+    __slots__ = ('method', 'path', 'url', 'status', 'attempts', 'total', 'global_wait', 'bucket_wait',
+                 'queue_wait', 'network', 'rate_limit_wait', 'retry_wait', 'rate_limited', 'server_errors')
+
+    def __init__(self, route):
+        self.method = route.method
+        self.path = route.path
+        self.url = route.url
+        self.status = None
+        self.attempts = 0
+        self.total = 0.0
+        self.global_wait = 0.0
+        self.bucket_wait = 0.0
+        self.queue_wait = 0.0
+        self.network = 0.0
+        self.rate_limit_wait = 0.0
+        self.retry_wait = 0.0
+        self.rate_limited = 0
+        self.server_errors = 0
+
+    @property
+    def retries(self):
+        """int: The number of times the request was retried."""
+        return max(self.attempts - 1, 0)
+
+    @property
+    def wait(self):
+        """float: The total number of seconds spent waiting instead of on the network."""
+        return (self.global_wait + self.bucket_wait + self.queue_wait +
+                self.rate_limit_wait + self.retry_wait)
+
+    def __repr__(self):
+        return '<RequestInfo method={0.method} path={0.path} status={0.status} total={0.total:.3f}>'.format(self)
+
+class LatencyHistogram:
+    """A fixed bucket histogram of durations in seconds."""
+
+    __slots__ = ['bounds', 'counts', 'count', 'total']
+
+    DEFAULT_BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.bounds = tuple(bounds)
+        # the last slot counts the values above the largest bound
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def percentile(self, q):
+        """Returns the upper bound of the bucket holding the ``q`` quantile,
+        where ``q`` is between 0 and 1, or ``None`` if it has no values."""
+        if not self.count:
+            return None
+
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float('inf')
+
+    def snapshot(self):
+        buckets = list(zip(self.bounds + (float('inf'),), self.counts))
+        return HistogramSnapshot(count=self.count, total=self.total, buckets=buckets)
+
+class RouteMetrics:
+    __slots__ = ['requests', 'retries', 'rate_limited', 'server_errors', 'errors',
+                 'total', 'queue', 'network', 'rate_limit_wait', 'retry_wait']
+
+    def __init__(self, bounds):
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.server_errors = 0
+        self.errors = 0
+        self.total = LatencyHistogram(bounds)
+        # time spent waiting on the bucket, the global limit and the scheduler
+        self.queue = LatencyHistogram(bounds)
+        self.network = LatencyHistogram(bounds)
+        self.rate_limit_wait = LatencyHistogram(bounds)
+        # time spent backing off before retrying failed attempts
+        self.retry_wait = LatencyHistogram(bounds)
+
+    def snapshot(self):
+        return RouteSnapshot(requests=self.requests, retries=self.retries, rate_limited=self.rate_limited,
+                             server_errors=self.server_errors, errors=self.errors,
+                             total=self.total.snapshot(), queue=self.queue.snapshot(),
+                             network=self.network.snapshot(), rate_limit_wait=self.rate_limit_wait.snapshot(),
+                             retry_wait=self.retry_wait.snapshot())
+
+class HTTPMetrics:
+    """Aggregates :class:`RequestInfo` records per route.
+
+    Routes are keyed by ``(method, path)`` where the path is the route
+    template, so all channels share the statistics of an endpoint.
+
+    Attributes
+    -----------
+    global_rate_limits : int
+        The number of global 429 responses received.
+    global_wait : float
+        The total number of seconds requests spent waiting on global rate limits.
+    """
+
+    def __init__(self, bounds=LatencyHistogram.DEFAULT_BOUNDS):
+        self.bounds = bounds
+        self.routes = {}
+        self.global_rate_limits = 0
+        self.global_wait = 0.0
+
+    def record(self, info, error=False):
+        key = (info.method, info.path)
+        route = self.routes.get(key)
+        if route is None:
+            route = RouteMetrics(self.bounds)
+            self.routes[key] = route
+
+        route.requests += 1
+        route.retries += info.retries
+        route.rate_limited += info.rate_limited
+        route.server_errors += info.server_errors
+        if error:
+            route.errors += 1
+
+        route.total.observe(info.total)
+        route.queue.observe(info.global_wait + info.bucket_wait + info.queue_wait)
+        route.network.observe(info.network)
+        if info.rate_limited:
+            route.rate_limit_wait.observe(info.rate_limit_wait)
+        if info.retries > info.rate_limited:
+            # retried after an error rather than only after a 429
+            route.retry_wait.observe(info.retry_wait)
+
+        self.global_wait += info.global_wait
+
+    def snapshot(self):
+        """Returns a dict mapping ``(method, path)`` to a snapshot of the route's counters and histograms."""
+        return {key: route.snapshot() for key, route in self.routes.items()}
+
+    def reset(self):
+        self.routes.clear()
+        self.global_rate_limits = 0
+        self.global_wait = 0.0
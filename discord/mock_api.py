@@ -0,0 +1,432 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-2016 Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import random
+import re
+import sys
+import time
+from collections import namedtuple
+
+from aiohttp import web
+
+log = logging.getLogger(__name__)
+
+MockStats = namedtuple('MockStats', 'requests rate_limited global_rate_limited violations injected_errors')
+
+DISCORD_EPOCH = 1420070400000
+
+class MockDiscordAPI:
+    """A local fake of the Discord REST API for load testing :class:`Client`.
+
+    Every route used by the library is answered, with minimal but well
+    formed payloads for the routes whose responses the library parses.
+    Rate limits are emulated the way Discord does: per bucket limits keyed by
+    the method, route and major parameters, a global limit and the matching
+    ``X-RateLimit-*`` headers and 429 responses.
+
+    Point a client at it by changing ``discord.http.Route.BASE`` to :attr:`base_url`.
+
+    Parameters
+    -----------
+    loop
+        The event loop to use.
+    host : str
+        The host to listen on. Defaults to ``127.0.0.1``.
+    port : int
+        The port to listen on. Defaults to ``0``, which picks a free port.
+    bucket_limit : int
+        The number of requests allowed per bucket and window.
+    bucket_window : float
+        The number of seconds after which a bucket resets.
+    global_limit : Optional[int]
+        The number of requests allowed per second over all buckets. ``None`` disables it.
+    latency : float
+        The number of seconds every response is delayed by.
+    latency_jitter : float
+        The maximum number of seconds randomly added to ``latency``.
+    error_rate : float
+        The fraction of requests, between 0 and 1, answered with a server error.
+    error_statuses
+        The status codes used for injected errors.
+    seed
+        The seed for the random number generator, for reproducible runs.
+    reaction_count : int
+        The number of users every reaction has.
+    member_count : int
+        The number of members every guild has.
+    """
+
+    # the major parameters that split buckets, like the real API
+    MAJOR_PARAMETERS = re.compile(r'^/(channels|guilds)/(\d+)')
+    SNOWFLAKE = re.compile(r'/\d+')
+
+    def __init__(self, *, loop=None, host='127.0.0.1', port=0, bucket_limit=5, bucket_window=5.0,
+                          global_limit=50, latency=0.0, latency_jitter=0.0, error_rate=0.0,
+                          error_statuses=(500, 502, 503), seed=None, reaction_count=0,
+                          member_count=0):
+        self.loop = asyncio.get_event_loop() if loop is None else loop
+        self.host = host
+        self.port = port
+        self.bucket_limit = bucket_limit
+        self.bucket_window = bucket_window
+        self.global_limit = global_limit
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.random = random.Random(seed)
+        self.reaction_count = reaction_count
+        self.member_count = member_count
+
+        self.app = None
+        self.server = None
+        self._handler = None
+        # bucket key -> [remaining, reset at]
+        self._buckets = {}
+        self._global_window = 0
+        self._global_count = 0
+        self._ids = 0
+        self.reset_stats()
+
+        self.user = {
+            'id': self._snowflake(),
+            'username': 'Mock',
+            'discriminator': '0001',
+            'avatar': None,
+            'bot': True,
+        }
+
+    @property
+    def base_url(self):
+        """str: The value to use as ``Route.BASE``."""
+        return 'http://{0.host}:{0.port}/api/v6'.format(self)
+
+    def reset_stats(self):
+        self.requests = 0
+        self.rate_limited = 0
+        self.global_rate_limited = 0
+        self.violations = 0
+        self.injected_errors = 0
+
+    def stats(self):
+        return MockStats(requests=self.requests, rate_limited=self.rate_limited,
+                         global_rate_limited=self.global_rate_limited, violations=self.violations,
+                         injected_errors=self.injected_errors)
+
+    @asyncio.coroutine
+    def start(self):
+        """|coro|
+
+        Starts serving. If ``port`` was ``0``, it is updated to the port picked.
+        """
+        self.app = web.Application(loop=self.loop)
+        self.app.router.add_route('*', '/api/v6/{path:.*}', self._handle)
+        self._handler = self.app.make_handler()
+        self.server = yield from self.loop.create_server(self._handler, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        log.info('Mock Discord API listening on {}'.format(self.base_url))
+
+    @asyncio.coroutine
+    def close(self):
+        """|coro|
+
+        Stops serving and closes the open connections.
+        """
+        if self.server is None:
+            return
+
+        self.server.close()
+        yield from self.server.wait_closed()
+        yield from self._handler.finish_connections(1.0)
+        yield from self.app.finish()
+        self.server = None
+
+    def _snowflake(self):
+        self._ids = (self._ids + 1) % 4096
+        return str(((int(time.time() * 1000) - DISCORD_EPOCH) << 22) | self._ids)
+
+    def _bucket_key(self, method, path):
+        match = self.MAJOR_PARAMETERS.match(path)
+        major = match.group(2) if match else None
+        rest = path[match.end():] if match else path
+        return (method, major, self.SNOWFLAKE.sub('/:id', rest))
+
+    def _response(self, status, data=None, headers=None):
+        headers = {} if headers is None else headers
+        if data is None:
+            headers['Content-Type'] = 'text/plain'
+            return web.Response(status=status, headers=headers)
+
+        # the library compares the content type exactly so no charset is added
+        headers['Content-Type'] = 'application/json'
+        return web.Response(status=status, body=json.dumps(data).encode('utf-8'), headers=headers)
+
+    def _check_global(self, now):
+        if self.global_limit is None:
+            return None
+
+        window = int(now)
+        if window != self._global_window:
+            self._global_window = window
+            self._global_count = 0
+
+        self._global_count += 1
+        if self._global_count <= self.global_limit:
+            return None
+
+        retry_after = window + 1 - now
+        self.global_rate_limited += 1
+        data = {'message': 'You are being rate limited.', 'retry_after': int(retry_after * 1000) + 1, 'global': True}
+        return self._response(429, data, {'X-RateLimit-Global': 'true'})
+
+    def _check_bucket(self, key, now, headers):
+        state = self._buckets.get(key)
+        if state is None or state[1] <= now:
+            state = [self.bucket_limit, now + self.bucket_window]
+            self._buckets[key] = state
+
+        reset_after = state[1] - now
+        headers['X-RateLimit-Limit'] = str(self.bucket_limit)
+        headers['X-RateLimit-Reset'] = '{:.3f}'.format(time.time() + reset_after)
+        headers['X-RateLimit-Reset-After'] = '{:.3f}'.format(reset_after)
+
+        if state[0] <= 0:
+            # a well behaved client never gets here without a global limit in the way
+            self.violations += 1
+            self.rate_limited += 1
+            headers['X-RateLimit-Remaining'] = '0'
+            data = {'message': 'You are being rate limited.', 'retry_after': int(reset_after * 1000) + 1, 'global': False}
+            return self._response(429, data, headers)
+
+        state[0] -= 1
+        headers['X-RateLimit-Remaining'] = str(state[0])
+        return None
+
+    @asyncio.coroutine
+    def _handle(self, request):
+        self.requests += 1
+        method = request.method
+        path = '/' + request.match_info['path']
+
+        delay = self.latency
+        if self.latency_jitter:
+            delay += self.random.uniform(0, self.latency_jitter)
+        if delay:
+            yield from asyncio.sleep(delay, loop=self.loop)
+
+        now = self.loop.time()
+        limited = self._check_global(now)
+        if limited is not None:
+            return limited
+
+        headers = {}
+        limited = self._check_bucket(self._bucket_key(method, path), now, headers)
+        if limited is not None:
+            return limited
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.injected_errors += 1
+            return self._response(self.random.choice(self.error_statuses), {'message': 'Injected error', 'code': 0})
+
+        body = None
+        if request.content_type == 'application/json':
+            body = yield from request.json()
+        elif request.content_type == 'multipart/form-data':
+            # file uploads send the rest of the message as a JSON field
+            form = yield from request.post()
+            body = json.loads(form.get('payload_json', '{}'))
+        else:
+            yield from request.read()
+
+        status, data = self._route(method, path, request.GET, body)
+        return self._response(status, data, headers)
+
+    def _message(self, channel_id, content=''):
+        return {
+            'id': self._snowflake(),
+            'channel_id': channel_id,
+            'author': self.user,
+            'content': content,
+            'timestamp': datetime.datetime.utcnow().isoformat(),
+            'edited_timestamp': None,
+            'tts': False,
+            'mention_everyone': False,
+            'mentions': [],
+            'mention_roles': [],
+            'attachments': [],
+            'embeds': [],
+            'pinned': False,
+            'type': 0,
+        }
+
+    def _route(self, method, path, query, body):
+        parts = path.strip('/').split('/')
+        body = body if isinstance(body, dict) else {}
+
+        if path == '/gateway' or path == '/gateway/bot':
+            return 200, {'url': 'ws://{0.host}:{0.port}/gateway'.format(self), 'shards': 1}
+        if path == '/users/@me' and method in ('GET', 'PATCH'):
+            self.user.update((k, v) for k, v in body.items() if k in ('username', 'avatar'))
+            return 200, self.user
+        if path == '/oauth2/applications/@me':
+            return 200, {'id': self.user['id'], 'name': 'Mock', 'description': '', 'icon': None,
+                         'rpc_origins': None, 'owner': self.user}
+        if path == '/users/@me/channels':
+            recipient = {'id': body.get('recipient_id'), 'username': 'Recipient', 'discriminator': '0002', 'avatar': None}
+            return 200, {'id': self._snowflake(), 'type': 1, 'is_private': True, 'recipient': recipient}
+
+        if parts[0] == 'channels' and len(parts) >= 3 and parts[2] == 'messages':
+            channel_id = parts[1]
+            if len(parts) == 3 and method == 'POST':
+                return 200, self._message(channel_id, body.get('content', ''))
+            if len(parts) == 3 and method == 'GET':
+                limit = min(int(query.get('limit', 50)), 100)
+                return 200, [self._message(channel_id) for _ in range(limit)]
+            if len(parts) == 4 and method in ('GET', 'PATCH'):
+                message = self._message(channel_id, body.get('content', ''))
+                message['id'] = parts[3]
+                return 200, message
+
+        if method == 'GET' and len(parts) == 6 and parts[4] == 'reactions':
+            # users are sorted by ID, which are 1 to reaction_count here
+            after = int(query.get('after', 0))
+            limit = min(int(query.get('limit', 100)), 100)
+            ids = range(after + 1, min(after + limit, self.reaction_count) + 1)
+            return 200, [{'id': str(i), 'username': 'User {}'.format(i), 'discriminator': '0000', 'avatar': None}
+                         for i in ids]
+
+        if method == 'GET' and len(parts) == 3 and parts[0] == 'guilds' and parts[2] == 'members':
+            after = int(query.get('after', 0))
+            limit = min(int(query.get('limit', 1)), 1000)
+            ids = range(after + 1, min(after + limit, self.member_count) + 1)
+            return 200, [{'user': {'id': str(i), 'username': 'User {}'.format(i), 'discriminator': '0000',
+                                   'avatar': None, 'bot': i % 10 == 0},
+                          'nick': None, 'roles': [], 'joined_at': '2017-01-01T00:00:00+00:00',
+                          'deaf': False, 'mute': False} for i in ids]
+
+        if method in ('DELETE', 'PUT') or path.endswith('/typing') or path.endswith('/bulk_delete'):
+            return 204, None
+        if method == 'GET' and (parts[-1] in ('invites', 'pins', 'bans', 'messages') or '/reactions/' in path):
+            return 200, []
+
+        data = dict(body)
+        data.setdefault('id', parts[-1] if parts[-1].isdigit() else self._snowflake())
+        return 200, data
+
+@asyncio.coroutine
+def run_benchmark(*, requests=1000, channels=10, loop=None, **options):
+    """|coro|
+
+    Starts a :class:`MockDiscordAPI`, sends ``requests`` messages spread over
+    ``channels`` channels through a :class:`Client` pointed at it and returns
+    a dict with the throughput, the failures and the server's statistics.
+
+    Extra keyword arguments are passed to :class:`MockDiscordAPI`.
+    """
+    from .client import Client
+    from .object import Object
+    from .http import Route
+
+    loop = asyncio.get_event_loop() if loop is None else loop
+    server = MockDiscordAPI(loop=loop, **options)
+    yield from server.start()
+
+    old_base = Route.BASE
+    Route.BASE = server.base_url
+    client = Client(loop=loop)
+    try:
+        yield from client.login('mock-token')
+        server.reset_stats()
+
+        destinations = [Object(id=str(100000000000000000 + i)) for i in range(channels)]
+        start = loop.time()
+        coros = [client.send_message(destinations[i % channels], 'benchmark {}'.format(i)) for i in range(requests)]
+        results = yield from asyncio.gather(*coros, loop=loop, return_exceptions=True)
+        elapsed = loop.time() - start
+    finally:
+        Route.BASE = old_base
+        yield from client.close()
+        yield from server.close()
+
+    failures = [r for r in results if isinstance(r, Exception)]
+    route = client.http.metrics.routes.get(('POST', '/channels/{channel_id}/messages'))
+    return {
+        'requests': requests,
+        'elapsed': elapsed,
+        'throughput': requests / elapsed if elapsed else float('inf'),
+        'failures': len(failures),
+        'p50': route.total.percentile(0.5) if route else None,
+        'p99': route.total.percentile(0.99) if route else None,
+        'server': server.stats()._asdict(),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m discord.mock_api',
+                                     description='Runs a mock Discord REST API or benchmarks the client against it.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--bucket-limit', type=int, default=5)
+    parser.add_argument('--bucket-window', type=float, default=5.0)
+    parser.add_argument('--global-limit', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--latency-jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--benchmark', type=int, metavar='REQUESTS',
+                        help='send this many messages through a Client and print the results')
+    parser.add_argument('--channels', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    loop = asyncio.get_event_loop()
+    options = dict(host=args.host, port=args.port, bucket_limit=args.bucket_limit, bucket_window=args.bucket_window,
+                   global_limit=args.global_limit, latency=args.latency, latency_jitter=args.latency_jitter,
+                   error_rate=args.error_rate, seed=args.seed)
+
+    if args.benchmark:
+        result = loop.run_until_complete(run_benchmark(requests=args.benchmark, channels=args.channels,
+                                                       loop=loop, **options))
+        print(json.dumps(result, indent=2))
+        return 1 if result['server']['violations'] else 0
+
+    server = MockDiscordAPI(loop=loop, **options)
+    loop.run_until_complete(server.start())
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(server.close())
+        loop.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
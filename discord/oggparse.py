@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-2016 Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import struct
+
+from .errors import DiscordException
+
+class OggError(DiscordException):
+    """An exception that is thrown for Ogg stream parsing errors."""
+    pass
+
+class OggPage:
+    """A single page of an Ogg stream.
+
+    Attributes
+    -----------
+    flags : int
+        The header type flags of the page.
+    granule_position : int
+        The granule position of the page.
+    serial : int
+        The serial number of the logical stream the page belongs to.
+    segments : list of bytes
+        The segments of the page, split according to its lacing values.
+    """
+
+    _header = struct.Struct('<xBqIIIB')
+
+    __slots__ = ['flags', 'granule_position', 'serial', 'segments', '_lacing']
+
+    def __init__(self, stream):
+        try:
+            header = stream.read(self._header.size)
+            self.flags, self.granule_position, self.serial, _, _, count = self._header.unpack(header)
+            lacing = stream.read(count)
+            body = stream.read(sum(lacing))
+        except struct.error:
+            raise OggError('bad data stream') from None
+
+        if len(lacing) != count or len(body) != sum(lacing):
+            raise OggError('bad data stream')
+
+        self._lacing = lacing
+        self.segments = segments = []
+        offset = 0
+        for size in lacing:
+            segments.append(body[offset:offset + size])
+            offset += size
+
+    @property
+    def continued(self):
+        """bool: Indicates if the first packet of the page continues one from the previous page."""
+        return bool(self.flags & 0x01)
+
+    def iter_packets(self):
+        """Yields ``(data, complete)`` for every packet of the page.
+
+        ``complete`` is ``False`` for the last packet if it continues on the
+        next page.
+        """
+        partial = []
+        for size, segment in zip(self._lacing, self.segments):
+            partial.append(segment)
+            # a lacing value of 255 means the packet goes on in the next segment
+            if size < 255:
+                yield b''.join(partial), True
+                partial = []
+
+        if partial:
+            yield b''.join(partial), False
+
+class OggStream:
+    """Reads the packets of a logical Ogg stream from a file-like object.
+
+    Only the first logical stream is read, pages of any other streams
+    multiplexed into the file are skipped.
+
+    Parameters
+    -----------
+    stream
+        A file-like object opened in binary mode. Only ``read`` is used,
+        so pipes work as well.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.serial = None
+
+    def _next_page(self):
+        head = self.stream.read(4)
+        if not head:
+            return None
+        if head != b'OggS':
+            raise OggError('invalid header magic')
+        return OggPage(self.stream)
+
+    def iter_pages(self):
+        """Yields the :class:`OggPage` objects of the stream."""
+        while True:
+            page = self._next_page()
+            if page is None:
+                return
+
+            if self.serial is None:
+                self.serial = page.serial
+            elif page.serial != self.serial:
+                continue
+
+            yield page
+
+    def iter_packets(self):
+        """Yields the packets of the stream as bytes."""
+        partial = b''
+        for page in self.iter_pages():
+            for data, complete in page.iter_packets():
+                partial += data
+                if complete:
+                    yield partial
+                    partial = b''
+
+class OpusStream(OggStream):
+    """Reads the Opus packets of an Ogg Opus stream, as produced by ``opusenc``
+    or by ``ffmpeg -c:a copy -f ogg`` from an Opus WebM file.
+
+    The ``OpusHead`` and ``OpusTags`` header packets are checked and
+    skipped, so iterating yields the audio packets only. These can be passed
+    to :meth:`VoiceClient.play_audio` with ``encode=False`` as they are.
+
+    Attributes
+    -----------
+    channels : int
+        The number of channels of the stream, available once the header
+        has been read.
+    pre_skip : int
+        The number of samples at the start of the stream the decoder drops.
+    """
+
+    _head = struct.Struct('<8sBBHIhB')
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.channels = None
+        self.pre_skip = None
+
+    def iter_packets(self):
+        packets = super().iter_packets()
+        try:
+            head = next(packets)
+            tags = next(packets)
+        except StopIteration:
+            return
+
+        try:
+            magic, version, self.channels, self.pre_skip, _, _, _ = self._head.unpack_from(head)
+        except struct.error:
+            raise OggError('not an Opus stream') from None
+
+        if magic != b'OpusHead' or version >> 4 != 0:
+            raise OggError('not an Opus stream')
+        if not tags.startswith(b'OpusTags'):
+            raise OggError('missing the OpusTags header')
+
+        yield from packets
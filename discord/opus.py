@@ -137,6 +137,47 @@ def is_loaded():
     global _lib
     return _lib is not None
 
+# the frame duration of each TOC configuration, in samples at 48 kHz
+_config_samples = [480, 960, 1920, 2880] * 3 + [480, 960] * 2 + [120, 240, 480, 960] * 4
+
+def packet_samples(packet):
+    """Returns the number of samples per channel an Opus packet decodes to.
+
+    This reads the table of contents of the packet and does not need
+    the opus library to be loaded. Opus always uses a 48 kHz clock, so the
+    result is also what the RTP timestamp advances by for this packet.
+
+    Parameters
+    -----------
+    packet : bytes
+        The Opus packet.
+
+    Raises
+    -------
+    ValueError
+        The packet is empty or malformed.
+
+    Returns
+    --------
+    int
+        The number of samples per channel at 48 kHz.
+    """
+    if not packet:
+        raise ValueError('empty Opus packet')
+
+    toc = packet[0]
+    code = toc & 0x03
+    if code == 0:
+        frames = 1
+    elif code != 3:
+        frames = 2
+    elif len(packet) < 2:
+        raise ValueError('malformed Opus packet')
+    else:
+        frames = packet[1] & 0x3F
+
+    return frames * _config_samples[toc >> 3]
+
 class OpusError(DiscordException):
     """An exception that is thrown for libopus related errors.
 
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-2016 Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import datetime
+from collections import namedtuple
+
+from .iterators import LogsFromIterator
+from .errors import HTTPException, NotFound
+from . import utils, compat
+
+PurgeProgress = namedtuple('PurgeProgress', 'channel scanned matched deleted done')
+
+# messages older than this can't be bulk deleted
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14)
+# leave room for the purge itself taking a while
+BULK_DELETE_MARGIN = datetime.timedelta(minutes=10)
+
+# the error code returned when bulk deleting a message that is too old
+BULK_DELETE_TOO_OLD = 50034
+
+class ChannelPurger:
+    """Deletes the messages of a channel while its history is still being fetched.
+
+    Messages young enough to be bulk deleted are deleted 100 at a time, the
+    rest one by one. All the delete requests are started as soon as their
+    messages are known, with ``semaphore`` bounding how many run at once, so
+    fetching pauses while the deletes catch up instead of piling up tasks.
+    The semaphore can be shared between several purgers to bound the total.
+    """
+
+    def __init__(self, client, channel, *, limit=100, check=None, before=None, after=None, around=None,
+                       semaphore, priority=None, progress=None):
+        self.client = client
+        self.http = client.http
+        self.loop = client.loop
+        self.channel = channel
+        self.check = check
+        self.semaphore = semaphore
+        self.priority = priority
+        self.progress = progress
+
+        self.iterator = LogsFromIterator(client, channel, limit, before=before, after=after, around=around,
+                                         prefetch=1)
+        self.scanned = 0
+        self.matched = []
+        self.deleted = 0
+        self._failed = set()
+        self._tasks = set()
+        self._error = None
+
+    @property
+    def guild_id(self):
+        return None if getattr(self.channel, 'is_private', True) else self.channel.server.id
+
+    def _report(self, done=False):
+        if self.progress is not None:
+            self.progress(PurgeProgress(channel=self.channel, scanned=self.scanned, matched=len(self.matched),
+                                        deleted=self.deleted, done=done))
+
+    @asyncio.coroutine
+    def _spawn(self, coro):
+        # wait for a free slot first so a huge purge doesn't create a task per message up front
+        yield from self.semaphore.acquire()
+        task = compat.create_task(self._run(coro), loop=self.loop)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @asyncio.coroutine
+    def _run(self, coro):
+        try:
+            if self.priority is None:
+                yield from coro
+            else:
+                with self.http.use_priority(self.priority):
+                    yield from coro
+        except Exception as e:
+            if self._error is None:
+                self._error = e
+        finally:
+            self.semaphore.release()
+            self._report()
+
+    @asyncio.coroutine
+    def _delete_single(self, message):
+        try:
+            yield from self.http.delete_message(self.channel.id, message.id, self.guild_id)
+        except NotFound:
+            # someone else got to it first
+            self._failed.add(message.id)
+        else:
+            self.deleted += 1
+
+    @asyncio.coroutine
+    def _delete_bulk(self, messages):
+        if len(messages) == 1:
+            yield from self._delete_single(messages[0])
+            return
+
+        try:
+            yield from self.http.delete_messages(self.channel.id, [m.id for m in messages], self.guild_id)
+        except HTTPException as e:
+            if getattr(e, 'code', None) != BULK_DELETE_TOO_OLD:
+                raise
+
+            # some of them aged past the cutoff since the purge started
+            for message in messages:
+                yield from self._delete_single(message)
+        else:
+            self.deleted += len(messages)
+
+    @asyncio.coroutine
+    def run(self):
+        """|coro|
+
+        Runs the purge and returns the list of deleted messages.
+
+        The first error raised by a delete is raised once all the started
+        deletes are finished.
+        """
+        cutoff = utils.time_snowflake(datetime.datetime.utcnow() - BULK_DELETE_MAX_AGE + BULK_DELETE_MARGIN)
+        batch = []
+
+        try:
+            while self._error is None:
+                page = yield from self.iterator.next_page()
+                if not page:
+                    break
+
+                self.scanned += len(page)
+                for message in page:
+                    if self.check is not None and not self.check(message):
+                        continue
+
+                    self.matched.append(message)
+                    if int(message.id) > cutoff:
+                        batch.append(message)
+                        if len(batch) == 100:
+                            yield from self._spawn(self._delete_bulk(batch))
+                            batch = []
+                    else:
+                        yield from self._spawn(self._delete_single(message))
+
+            if batch and self._error is None:
+                yield from self._spawn(self._delete_bulk(batch))
+
+            if self._tasks:
+                yield from asyncio.wait(list(self._tasks), loop=self.loop)
+        except BaseException:
+            # don't leave deletes running behind a failed or cancelled purge
+            for task in self._tasks:
+                task.cancel()
+            raise
+        finally:
+            self.iterator.close()
+
+        self._report(done=True)
+        if self._error is not None:
+            raise self._error
+
+        return [m for m in self.matched if m.id not in self._failed]
@@ -0,0 +1,536 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-2016 Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import datetime
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import os
+import sys
+from email.utils import parsedate_to_datetime
+
+from .enums import RequestPriority
+from . import utils, compat
+
+log = logging.getLogger(__name__)
+
+#: the number of buckets kept before idle ones are evicted
+BUCKET_EVICTION_THRESHOLD = 1024
+
+def evict_idle_buckets(buckets):
+    """Removes the buckets of a mapping that are idle and returns the number
+    of buckets that are left."""
+    for key in [key for key, bucket in buckets.items() if bucket.is_idle()]:
+        del buckets[key]
+    return len(buckets)
+
+class RateLimitBucket:
+    """Tracks the rate limit state of a single bucket.
+
+    Rather than serialising every request of a bucket behind a lock, this
+    allows as many requests to run concurrently as the bucket has remaining
+    uses. Until the first response for the bucket comes back the limit is
+    unknown, so only a single request is let through to discover it.
+
+    Waiting requests are kept in a heap ordered by priority and then by
+    arrival, and every freed slot is handed to the first of them directly,
+    so a release only wakes up as many requests as there are free slots.
+
+    Attributes
+    -----------
+    key
+        The bucket key of the :class:`Route` this tracks.
+    limit : int
+        The number of requests allowed per window.
+    remaining : int
+        The number of requests left in the current window, as last reported by Discord.
+    reset_at : Optional[float]
+        The :meth:`asyncio.BaseEventLoop.time` at which the current window resets.
+    in_flight : int
+        The number of requests currently holding a slot.
+    """
+
+    def __init__(self, key, *, loop):
+        self.key = key
+        self.loop = loop
+        self.limit = 1
+        self.remaining = 1
+        self.reset_at = None
+        self.in_flight = 0
+        # heap of (priority, arrival, future)
+        self._waiters = []
+        self._arrivals = itertools.count()
+        self._reset_handle = None
+
+    def _try_acquire(self):
+        if self.reset_at is not None and self.loop.time() >= self.reset_at:
+            self.remaining = max(self.remaining, self.limit)
+            self.reset_at = None
+
+        if self.remaining > self.in_flight:
+            self.in_flight += 1
+            return True
+        return False
+
+    def is_idle(self):
+        """Indicates if the bucket holds no state worth keeping, that is no
+        request holds or waits for a slot and its window has reset."""
+        if self.in_flight or any(not w[2].done() for w in self._waiters):
+            return False
+        return self.reset_at is None or self.loop.time() >= self.reset_at
+
+    def _wake(self):
+        self._reset_handle = None
+        self._dispatch()
+
+    def _dispatch(self):
+        # hand the free slots to the waiters at the top of the heap,
+        # skipping the ones that were cancelled in the meantime
+        waiters = self._waiters
+        while waiters:
+            future = waiters[0][2]
+            if future.done():
+                heapq.heappop(waiters)
+                continue
+            if not self._try_acquire():
+                break
+            heapq.heappop(waiters)
+            future.set_result(None)
+
+        if waiters and self.reset_at is not None and self._reset_handle is None:
+            self._reset_handle = self.loop.call_at(self.reset_at, self._wake)
+
+    @asyncio.coroutine
+    def acquire(self, priority=RequestPriority.normal):
+        # don't jump the queue of requests already waiting for a slot
+        if not self._waiters and self._try_acquire():
+            return
+
+        future = asyncio.Future(loop=self.loop)
+        heapq.heappush(self._waiters, (priority.value, next(self._arrivals), future))
+        self._dispatch()
+        try:
+            yield from future
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                # the slot was handed over right before the cancellation
+                self.release()
+            raise
+
+    def release(self):
+        self.in_flight -= 1
+        self._dispatch()
+
+    def exhaust(self, delay):
+        """Marks the bucket as depleted for the next ``delay`` seconds."""
+        self.remaining = 0
+        self.reset_at = self.loop.time() + delay
+        if self._reset_handle is not None:
+            self._reset_handle.cancel()
+            self._reset_handle = None
+        self._dispatch()
+
+    def update(self, headers, delay=None, sent_at=None):
+        """Updates the bucket from the rate limit headers of a response.
+
+        If ``delay`` is given it is used as the time until the reset instead
+        of the one given by the headers. ``sent_at`` is the UNIX time at which
+        the request was sent, see :meth:`parse_headers`.
+        """
+        parsed = self.parse_headers(headers, delay, sent_at)
+        if parsed is not None:
+            self.apply(*parsed)
+
+    def apply(self, remaining, limit, delay):
+        """Updates the bucket with already parsed rate limit information."""
+        if limit is not None:
+            self.limit = limit
+
+        if delay is None:
+            # without a reset time nothing would wake up the waiters of an
+            # exhausted bucket, so let requests through and let a 429 tell
+            # how long to wait instead
+            if self.reset_at is None:
+                self.remaining = max(remaining, 1)
+            else:
+                self.remaining = min(self.remaining, remaining)
+            return
+
+        reset_at = self.loop.time() + delay
+        if self.reset_at is None or reset_at > self.reset_at + 1.0:
+            # a new window so the reported values are authoritative
+            self.remaining = remaining
+            self.reset_at = reset_at
+        else:
+            # responses for the same window can arrive out of order so
+            # only ever lower the amount left
+            self.remaining = min(self.remaining, remaining)
+
+        if self.remaining == 0:
+            fmt = 'A rate limit bucket has been exhausted (bucket: {bucket}, retry: {delta}).'
+            log.info(fmt.format(bucket=self.key, delta=delay))
+
+    @classmethod
+    def parse_headers(cls, headers, delay=None, sent_at=None):
+        """Returns the ``(remaining, limit, delay)`` described by the headers
+        of a response or ``None`` if they hold no rate limit information.
+
+        Without an ``X-Ratelimit-Reset-After`` header the delay is counted
+        from ``sent_at``, the UNIX time at which the request was sent, to the
+        reset timestamp. Counting from the send time rather than the response
+        errs on the side of waiting slightly too long.
+        """
+        remaining = headers.get('X-Ratelimit-Remaining')
+        if remaining is None:
+            return None
+
+        limit = headers.get('X-Ratelimit-Limit')
+        if limit is not None:
+            limit = int(limit)
+
+        if delay is None:
+            delay = cls._reset_delay(headers, sent_at)
+
+        return int(remaining), limit, delay
+
+    @staticmethod
+    def _reset_delay(headers, sent_at=None):
+        # the relative header doesn't depend on any clock so prefer it
+        reset_after = headers.get('X-Ratelimit-Reset-After')
+        if reset_after is not None:
+            return float(reset_after)
+
+        reset = headers.get('X-Ratelimit-Reset')
+        if reset is None:
+            return None
+
+        # the reset has millisecond precision while the Date header only
+        # has whole seconds, so only fall back to the latter when the send
+        # time isn't known
+        if sent_at is not None:
+            return max(float(reset) - sent_at, 0.0)
+
+        now = parsedate_to_datetime(headers['Date'])
+        reset = datetime.datetime.fromtimestamp(float(reset), datetime.timezone.utc)
+        return max((reset - now).total_seconds(), 0.0)
+
+class RateLimitCoordinator:
+    """A local service that holds the rate limit state shared by several processes.
+
+    Every process that uses the same token and points its :class:`HTTPClient`
+    at the coordinator's unix socket asks the coordinator for a slot before each
+    request and reports the rate limit headers back. This lets the processes
+    see each other's usage, including global rate limits, instead of each one
+    tripping over limits it couldn't know about.
+
+    The coordinator can be started from the command line: ::
+
+        python -m discord.ratelimit /tmp/discord-ratelimit.sock
+
+    The protocol is newline delimited JSON over the socket. If a process
+    disconnects, the slots it held are released.
+
+    Parameters
+    -----------
+    path : str
+        The path of the unix socket to listen on.
+    loop
+        The event loop to use.
+    """
+
+    def __init__(self, path, *, loop=None):
+        self.path = path
+        self.loop = asyncio.get_event_loop() if loop is None else loop
+        self.server = None
+        # (namespace, bucket key) -> RateLimitBucket
+        self._buckets = {}
+        self._evict_at = BUCKET_EVICTION_THRESHOLD
+        # namespace -> loop time at which the global rate limit is over
+        self._global_until = {}
+
+    def _get_bucket(self, namespace, key):
+        bucket = self._buckets.get((namespace, key))
+        if bucket is None:
+            if len(self._buckets) >= self._evict_at:
+                left = evict_idle_buckets(self._buckets)
+                self._evict_at = max(BUCKET_EVICTION_THRESHOLD, left * 2)
+            bucket = RateLimitBucket(key, loop=self.loop)
+            self._buckets[(namespace, key)] = bucket
+        return bucket
+
+    @asyncio.coroutine
+    def start(self):
+        """|coro|
+
+        Starts listening on the unix socket.
+        """
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.server = yield from asyncio.start_unix_server(self._handle, path=self.path, loop=self.loop)
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+
+    @asyncio.coroutine
+    def _grant(self, namespace, key, priority, holds, writer, request_id):
+        while True:
+            delay = self._global_until.get(namespace, 0.0) - self.loop.time()
+            if delay <= 0:
+                break
+            yield from asyncio.sleep(delay, loop=self.loop)
+
+        bucket = self._get_bucket(namespace, key)
+        yield from bucket.acquire(priority)
+        holds.append(bucket)
+        writer.write(utils.to_json({'id': request_id}).encode('utf-8') + b'\n')
+
+    @asyncio.coroutine
+    def _handle(self, reader, writer):
+        holds = []
+        pending = set()
+        try:
+            while True:
+                line = yield from reader.readline()
+                if not line:
+                    break
+
+                data = json.loads(line.decode('utf-8'))
+                op = data['op']
+                namespace = data.get('ns')
+                key = data.get('bucket')
+                if isinstance(key, list):
+                    # bucket keys are tuples but JSON only has arrays
+                    key = tuple(key)
+
+                if op == 'acquire':
+                    priority = RequestPriority(data.get('priority', RequestPriority.normal.value))
+                    task = compat.create_task(self._grant(namespace, key, priority, holds, writer, data['id']),
+                                              loop=self.loop)
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                elif op == 'release':
+                    bucket = self._buckets.get((namespace, key))
+                    if bucket is not None and bucket in holds:
+                        holds.remove(bucket)
+                        bucket.release()
+                elif op == 'update':
+                    self._get_bucket(namespace, key).apply(data['remaining'], data.get('limit'), data.get('delay'))
+                elif op == 'exhaust':
+                    self._get_bucket(namespace, key).exhaust(data['delay'])
+                elif op == 'global':
+                    until = self.loop.time() + data['delay']
+                    self._global_until[namespace] = max(self._global_until.get(namespace, 0.0), until)
+        except (ConnectionError, ValueError, KeyError) as e:
+            log.info('Dropping rate limit coordinator client: {}'.format(e))
+        finally:
+            for task in list(pending):
+                task.cancel()
+            for bucket in holds:
+                bucket.release()
+            writer.close()
+
+class SharedRateLimiter:
+    """The client side of a :class:`RateLimitCoordinator`.
+
+    All methods fail softly: if the coordinator can't be reached, :meth:`acquire`
+    returns ``False`` and the caller is expected to fall back to its own
+    in-process rate limiting. Reconnecting is attempted at most once every
+    ``retry_interval`` seconds.
+
+    Parameters
+    -----------
+    path : str
+        The path of the coordinator's unix socket.
+    loop
+        The event loop to use.
+    retry_interval : float
+        The number of seconds to wait between connection attempts.
+    """
+
+    def __init__(self, path, *, loop, retry_interval=30.0):
+        self.path = path
+        self.loop = loop
+        self.retry_interval = retry_interval
+        self.namespace = None
+        self._writer = None
+        self._reader_task = None
+        self._waiters = {}
+        self._next_id = 0
+        self._last_attempt = None
+        self._connecting = None
+
+    @property
+    def available(self):
+        """bool: Indicates if the coordinator is currently connected."""
+        return self._writer is not None
+
+    def set_token(self, token):
+        # processes are grouped by token without sending the token itself
+        self.namespace = None if token is None else hashlib.sha256(token.encode('utf-8')).hexdigest()[:32]
+
+    @asyncio.coroutine
+    def ensure_connected(self):
+        if self._writer is not None:
+            return True
+
+        if self._connecting is None:
+            now = self.loop.time()
+            if self._last_attempt is not None and now - self._last_attempt < self.retry_interval:
+                return False
+
+            self._last_attempt = now
+            self._connecting = compat.create_task(self._connect(), loop=self.loop)
+
+        # requests made while connecting wait for the same attempt
+        return (yield from asyncio.shield(self._connecting, loop=self.loop))
+
+    @asyncio.coroutine
+    def _connect(self):
+        try:
+            reader, writer = yield from asyncio.open_unix_connection(self.path, loop=self.loop)
+        except (OSError, AttributeError) as e:
+            log.info('Could not reach the rate limit coordinator at {}: {}'.format(self.path, e))
+            return False
+        finally:
+            self._connecting = None
+
+        log.info('Connected to the rate limit coordinator at {}.'.format(self.path))
+        self._writer = writer
+        self._reader_task = compat.create_task(self._read(reader), loop=self.loop)
+        return True
+
+    @asyncio.coroutine
+    def _read(self, reader):
+        try:
+            while True:
+                line = yield from reader.readline()
+                if not line:
+                    break
+                data = json.loads(line.decode('utf-8'))
+                future = self._waiters.pop(data['id'], None)
+                if future is not None and not future.done():
+                    future.set_result(None)
+        except (ConnectionError, ValueError) as e:
+            log.info('Lost the rate limit coordinator: {}'.format(e))
+        finally:
+            self._disconnect()
+
+    def _disconnect(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+        waiters, self._waiters = self._waiters, {}
+        for future in waiters.values():
+            if not future.done():
+                future.set_exception(ConnectionError('rate limit coordinator disconnected'))
+
+    def _send(self, payload):
+        if self._writer is None:
+            return False
+
+        payload['ns'] = self.namespace
+        try:
+            self._writer.write(utils.to_json(payload).encode('utf-8') + b'\n')
+        except (ConnectionError, RuntimeError):
+            self._disconnect()
+            return False
+        return True
+
+    @asyncio.coroutine
+    def acquire(self, key, priority=RequestPriority.normal):
+        """|coro|
+
+        Waits for the coordinator to grant a slot in the bucket.
+        Returns ``False`` if the coordinator is unavailable.
+        """
+        connected = yield from self.ensure_connected()
+        if not connected:
+            return False
+
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.Future(loop=self.loop)
+        self._waiters[request_id] = future
+        if not self._send({'op': 'acquire', 'id': request_id, 'bucket': key, 'priority': priority.value}):
+            self._waiters.pop(request_id, None)
+            return False
+
+        try:
+            yield from future
+        except ConnectionError:
+            return False
+        except asyncio.CancelledError:
+            # the slot may still get granted so give it back right away
+            if self._waiters.pop(request_id, None) is None:
+                self.release(key)
+            raise
+        return True
+
+    def release(self, key):
+        self._send({'op': 'release', 'bucket': key})
+
+    def update(self, key, remaining, limit, delay):
+        self._send({'op': 'update', 'bucket': key, 'remaining': remaining, 'limit': limit, 'delay': delay})
+
+    def exhaust(self, key, delay):
+        self._send({'op': 'exhaust', 'bucket': key, 'delay': delay})
+
+    def global_limit(self, delay):
+        self._send({'op': 'global', 'delay': delay})
+
+    def close(self):
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        self._disconnect()
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print('usage: python -m discord.ratelimit SOCKET_PATH', file=sys.stderr)
+        return 2
+
+    logging.basicConfig(level=logging.INFO)
+    loop = asyncio.get_event_loop()
+    coordinator = RateLimitCoordinator(argv[0], loop=loop)
+    loop.run_until_complete(coordinator.start())
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        coordinator.close()
+        loop.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
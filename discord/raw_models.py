@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-2016 Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+class RawMessageDeleteEvent:
+    """Represents the payload for a :func:`on_raw_message_delete` event.
+
+    Attributes
+    -----------
+    message_id : str
+        The message ID that got deleted.
+    channel_id : str
+        The channel ID where the deletion took place.
+    server_id : Optional[str]
+        The server ID where the deletion took place, if applicable.
+    """
+
+    __slots__ = ['message_id', 'channel_id', 'server_id']
+
+    def __init__(self, data):
+        self.message_id = data['id']
+        self.channel_id = data['channel_id']
+        self.server_id = data.get('guild_id')
+
+class RawBulkMessageDeleteEvent:
+    """Represents the payload for a :func:`on_raw_bulk_message_delete` event.
+
+    Attributes
+    -----------
+    message_ids : Set[str]
+        The message IDs that got deleted.
+    channel_id : str
+        The channel ID where the deletion took place.
+    server_id : Optional[str]
+        The server ID where the deletion took place, if applicable.
+    """
+
+    __slots__ = ['message_ids', 'channel_id', 'server_id']
+
+    def __init__(self, data):
+        self.message_ids = set(data.get('ids', []))
+        self.channel_id = data['channel_id']
+        self.server_id = data.get('guild_id')
+
+class RawMessageUpdateEvent:
+    """Represents the payload for a :func:`on_raw_message_edit` event.
+
+    Attributes
+    -----------
+    message_id : str
+        The message ID that got updated.
+    channel_id : str
+        The channel ID where the update took place.
+    data : dict
+        The raw data given by the gateway. Since edits can be partial,
+        only the keys that changed are guaranteed to be present.
+    """
+
+    __slots__ = ['message_id', 'channel_id', 'data']
+
+    def __init__(self, data):
+        self.message_id = data['id']
+        self.channel_id = data['channel_id']
+        self.data = data
+
+class RawReactionActionEvent:
+    """Represents the payload for a :func:`on_raw_reaction_add` or
+    :func:`on_raw_reaction_remove` event.
+
+    Attributes
+    -----------
+    message_id : str
+        The message ID that got or lost a reaction.
+    user_id : str
+        The user ID who added or removed the reaction.
+    channel_id : str
+        The channel ID where the reaction got added or removed.
+    emoji : :class:`Emoji` or str
+        The emoji used. May be a custom emoji, or a unicode emoji.
+    """
+
+    __slots__ = ['message_id', 'user_id', 'channel_id', 'emoji']
+
+    def __init__(self, data, emoji):
+        self.message_id = data['message_id']
+        self.channel_id = data['channel_id']
+        self.user_id = data['user_id']
+        self.emoji = emoji
+
+class RawReactionClearEvent:
+    """Represents the payload for a :func:`on_raw_reaction_clear` event.
+
+    Attributes
+    -----------
+    message_id : str
+        The message ID that got its reactions cleared.
+    channel_id : str
+        The channel ID where the reactions got cleared.
+    """
+
+    __slots__ = ['message_id', 'channel_id']
+
+    def __init__(self, data):
+        self.message_id = data['message_id']
+        self.channel_id = data['channel_id']
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-2016 Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import random
+
+import aiohttp
+
+from .errors import CircuitOpen
+
+class RetryPolicy:
+    """Decides which failed REST requests are retried and how long to wait in between.
+
+    Delays grow exponentially from ``base_delay`` and are capped at ``max_delay``.
+    With ``jitter`` enabled the actual delay is picked at random between zero
+    and that value, so that many requests failing at once don't all retry in
+    the same instant.
+
+    Rate limited (429) responses are always retried after the delay given
+    by Discord, but they count towards ``max_attempts``.
+
+    Parameters
+    -----------
+    max_attempts : int
+        The maximum number of times a request is sent. Defaults to ``5``.
+    statuses
+        The response status codes that are retried. Defaults to 500, 502, 503 and 504.
+    exceptions
+        The exception types raised while sending a request that are retried.
+        Defaults to connection errors and timeouts.
+    methods
+        The HTTP methods for which these exceptions are retried. After an exception
+        there is no telling whether Discord already handled the request, so by
+        default only the idempotent methods GET, HEAD, PUT and DELETE are retried.
+        Add ``'POST'`` or ``'PATCH'`` to opt in to retrying those as well, at the
+        risk of e.g. sending a message twice.
+    base_delay : float
+        The delay in seconds before the first retry. Defaults to ``1.0``.
+    max_delay : float
+        The maximum delay in seconds between two attempts. Defaults to ``30.0``.
+    max_elapsed : Optional[float]
+        The number of seconds after which a request is no longer retried,
+        counted from the first attempt. Defaults to ``60.0``. ``None`` disables it.
+    jitter : bool
+        Whether to randomise the delays. Defaults to ``True``.
+    """
+
+    DEFAULT_STATUSES = frozenset({500, 502, 503, 504})
+    DEFAULT_EXCEPTIONS = (aiohttp.ClientError, ConnectionError, asyncio.TimeoutError)
+    DEFAULT_METHODS = frozenset({'GET', 'HEAD', 'PUT', 'DELETE'})
+
+    def __init__(self, *, max_attempts=5, statuses=DEFAULT_STATUSES, exceptions=DEFAULT_EXCEPTIONS,
+                          methods=DEFAULT_METHODS, base_delay=1.0, max_delay=30.0, max_elapsed=60.0,
+                          jitter=True):
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be at least 1')
+
+        self.max_attempts = max_attempts
+        self.statuses = frozenset(statuses)
+        self.exceptions = tuple(exceptions)
+        self.methods = frozenset(m.upper() for m in methods)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_elapsed = max_elapsed
+        self.jitter = jitter
+
+    def retries_status(self, status):
+        return status in self.statuses
+
+    def retries_exception(self, exc, method):
+        return isinstance(exc, self.exceptions) and method.upper() in self.methods
+
+    def backoff(self, attempt):
+        """Returns the delay in seconds before the next attempt, ``attempt``
+        being the number of attempts made so far."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def can_retry(self, attempt, elapsed, delay):
+        """Returns whether another attempt can be made after waiting ``delay`` seconds."""
+        if attempt >= self.max_attempts:
+            return False
+        return self.max_elapsed is None or elapsed + delay <= self.max_elapsed
+
+class CircuitBreaker:
+    """Fails requests to a route fast while the API is failing for it.
+
+    After ``failure_threshold`` consecutive failed attempts the breaker opens
+    and requests raise :exc:`CircuitOpen` without being sent or queued. Once
+    ``recovery_timeout`` seconds have passed a single request is let through
+    as a probe: if it succeeds the breaker closes again, otherwise it stays
+    open for another ``recovery_timeout``.
+
+    Parameters
+    -----------
+    key
+        The route the breaker is for.
+    loop
+        The event loop to use.
+    failure_threshold : int
+        The number of consecutive failures that open the breaker.
+    recovery_timeout : float
+        The number of seconds the breaker stays open before probing.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    __slots__ = ['key', 'loop', 'failure_threshold', 'recovery_timeout', 'state', 'failures', 'opened_at']
+
+    def __init__(self, key, *, loop, failure_threshold=5, recovery_timeout=30.0):
+        self.key = key
+        self.loop = loop
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+
+    def before_request(self):
+        """Raises :exc:`CircuitOpen` if the request may not be sent.
+
+        Returns ``True`` if the request is the probe of a half-open breaker.
+        """
+        if self.state == self.CLOSED:
+            return False
+
+        remaining = self.opened_at + self.recovery_timeout - self.loop.time()
+        if self.state == self.OPEN and remaining <= 0:
+            self.state = self.HALF_OPEN
+            return True
+
+        # either still open or a probe is already in flight
+        raise CircuitOpen(self.key, max(remaining, 0.0))
+
+    def record(self, success, probe=False):
+        """Records the outcome of an attempt.
+
+        ``success`` is ``None`` if the request ended without a verdict,
+        e.g. it was cancelled or failed with a client error.
+        """
+        if success:
+            self.state = self.CLOSED
+            self.failures = 0
+        elif success is None:
+            if probe and self.state == self.HALF_OPEN:
+                # let another request probe instead
+                self.state = self.OPEN
+                self.opened_at = self.loop.time() - self.recovery_timeout
+        else:
+            self.failures += 1
+            if probe or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = self.loop.time()
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-2016 Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+from collections import OrderedDict, deque, namedtuple
+
+from .enums import RequestPriority
+
+SchedulerStats = namedtuple('SchedulerStats', 'queued active completed total_wait max_wait')
+
+class _PriorityClass:
+    __slots__ = ['limit', 'queues', 'queued', 'active', 'completed', 'total_wait', 'max_wait']
+
+    def __init__(self, limit):
+        self.limit = limit
+        # fairness key -> deque of (future, enqueued at)
+        self.queues = OrderedDict()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+class RequestScheduler:
+    """Decides which REST requests get to go out to the network.
+
+    Requests are grouped by :class:`RequestPriority` and a higher priority
+    request is always started before a lower priority one. Inside a priority
+    class requests are queued per fairness key (usually the server ID) and
+    the keys take turns, so a single server doing mass work can't monopolise
+    a priority class.
+
+    Parameters
+    -----------
+    loop
+        The event loop to use.
+    max_concurrency : int
+        The maximum number of requests in flight at once.
+    limits : Optional[dict]
+        A mapping of :class:`RequestPriority` to the maximum number of requests
+        of that priority in flight at once. By default normal requests may use
+        up to 40 slots and bulk requests up to 10, which leaves room for
+        interactive requests.
+    """
+
+    DEFAULT_LIMITS = {
+        RequestPriority.normal: 40,
+        RequestPriority.bulk: 10,
+    }
+
+    def __init__(self, *, loop, max_concurrency=50, limits=None):
+        self.loop = loop
+        self.max_concurrency = max_concurrency
+        self._running = 0
+
+        limits = dict(self.DEFAULT_LIMITS if limits is None else limits)
+        self._classes = OrderedDict()
+        for priority in sorted(RequestPriority, key=lambda p: p.value):
+            self._classes[priority] = _PriorityClass(limits.get(priority, max_concurrency))
+
+    def _can_run(self, cls):
+        return self._running < self.max_concurrency and cls.active < cls.limit
+
+    def _start(self, cls, waited):
+        self._running += 1
+        cls.active += 1
+        cls.total_wait += waited
+        cls.max_wait = max(cls.max_wait, waited)
+
+    @asyncio.coroutine
+    def acquire(self, priority, key=None):
+        """|coro|
+
+        Waits until a request with the given priority and fairness key can run.
+        Every successful call must be paired with a call to :meth:`release`.
+        """
+        cls = self._classes[priority]
+
+        # only jump ahead if nobody of the same or a higher priority is waiting
+        if self._can_run(cls) and not any(c.queued for p, c in self._classes.items() if p.value <= priority.value):
+            self._start(cls, 0.0)
+            return
+
+        future = asyncio.Future(loop=self.loop)
+        queue = cls.queues.get(key)
+        if queue is None:
+            queue = cls.queues[key] = deque()
+        queue.append((future, self.loop.time()))
+        cls.queued += 1
+
+        try:
+            yield from future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                self._remove(cls, key, future)
+            else:
+                # we were already given a slot so hand it back
+                self.release(priority)
+            raise
+
+    def _remove(self, cls, key, future):
+        queue = cls.queues.get(key)
+        if queue is None:
+            return
+
+        for entry in queue:
+            if entry[0] is future:
+                queue.remove(entry)
+                cls.queued -= 1
+                break
+
+        if not queue:
+            del cls.queues[key]
+
+    def release(self, priority):
+        """Marks a request of the given priority as finished."""
+        cls = self._classes[priority]
+        self._running -= 1
+        cls.active -= 1
+        cls.completed += 1
+        self._dispatch()
+
+    def _dispatch(self):
+        now = self.loop.time()
+        for cls in self._classes.values():
+            while cls.queued and self._can_run(cls):
+                # take turns between the fairness keys
+                key, queue = next(iter(cls.queues.items()))
+                future, enqueued = queue.popleft()
+                cls.queued -= 1
+                if queue:
+                    cls.queues.move_to_end(key)
+                else:
+                    del cls.queues[key]
+
+                if future.done():
+                    continue
+
+                self._start(cls, now - enqueued)
+                future.set_result(None)
+
+            if self._running >= self.max_concurrency:
+                return
+
+    def stats(self):
+        """Returns the queue depth, active requests and wait times of every priority class.
+
+        Returns
+        --------
+        dict
+            A mapping of :class:`RequestPriority` to a ``SchedulerStats`` namedtuple
+            with the ``queued``, ``active`` and ``completed`` request counts and the
+            ``total_wait`` and ``max_wait`` spent queued in seconds.
+        """
+        return { p: SchedulerStats(c.queued, c.active, c.completed, c.total_wait, c.max_wait)
+                 for p, c in self._classes.items() }
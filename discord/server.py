@@ -30,6 +30,7 @@ from .member import Member
 from .emoji import Emoji
 from .game import Game
 from .channel import Channel
+from .member_store import ColumnarMemberStore
 from .enums import ServerRegion, Status, try_enum, VerificationLevel
 from .mixins import Hashable
 
@@ -76,8 +77,6 @@ class Server(Hashable):
         The server's icon.
     id : str
         The server's ID.
-    owner : :class:`Member`
-        The member who owns the server.
     unavailable : bool
         Indicates if the server is unavailable. If this is ``True`` then the
         reliability of other attributes outside of :meth:`Server.id` is slim and they might
@@ -109,15 +108,16 @@ class Server(Hashable):
     """
 
     __slots__ = ['afk_timeout', 'afk_channel', '_members', '_channels', 'icon',
-                 'name', 'id', 'owner', 'unavailable', 'name', 'region',
+                 'name', 'id', 'unavailable', 'name', 'region',
                  '_default_role', '_default_channel', 'roles', '_member_count',
                  'large', 'owner_id', 'mfa_level', 'emojis', 'features',
-                 'verification_level', 'splash' ]
+                 'verification_level', 'splash', '_voice_channels' ]
 
     def __init__(self, **kwargs):
         self._channels = {}
-        self.owner = None
-        self._members = {}
+        self.owner_id = None
+        self._members = ColumnarMemberStore(self) if kwargs.pop('columnar_members', False) else {}
+        self._voice_channels = {}
         self._from_data(kwargs)
 
     @property
@@ -134,6 +134,10 @@ class Server(Hashable):
     def _remove_channel(self, channel):
         self._channels.pop(channel.id, None)
 
+        # nobody can be connected to a channel that no longer exists
+        for user_id in [k for k, v in self._voice_channels.items() if v.id == channel.id]:
+            del self._voice_channels[user_id]
+
     @property
     def members(self):
         return self._members.values()
@@ -142,12 +146,63 @@ class Server(Hashable):
         """Returns a :class:`Member` with the given ID. If not found, returns None."""
         return self._members.get(user_id)
 
+    def count_members(self, *, status=None, role=None):
+        """Counts the cached members that match the given status and role.
+
+        If the server uses a columnar member store, the count is done over
+        the columns directly rather than building every :class:`Member`.
+
+        Parameters
+        -----------
+        status : Optional[:class:`Status`]
+            The status the members must have, e.g. :attr:`Status.online`.
+        role : Optional[:class:`Role`]
+            The role the members must have.
+
+        Returns
+        --------
+        int
+            The number of matching members.
+        """
+        if isinstance(self._members, ColumnarMemberStore):
+            return self._members.count(status=status, role=role)
+
+        def pred(m):
+            return (status is None or m.status == status) and (role is None or role in m.roles)
+
+        return sum(1 for m in self._members.values() if pred(m))
+
     def _add_member(self, member):
         self._members[member.id] = member
 
     def _remove_member(self, member):
         self._members.pop(member.id, None)
 
+        # remove them from the voice channel member list
+        channel = self._voice_channels.pop(member.id, None)
+        if channel is not None:
+            channel._remove_voice_member(member)
+
+    def voice_channel_for(self, user_id):
+        """Returns the voice :class:`Channel` the user with the given ID is
+        currently connected to. If they are not in a voice channel, returns None."""
+        return self._voice_channels.get(user_id)
+
+    @property
+    def occupied_voice_channels(self):
+        """Returns a list of voice :class:`Channel` that currently have at least one
+        member connected to them.
+
+        This only looks at the members in voice rather than every channel in the server.
+        """
+        ret = []
+        seen = set()
+        for channel in self._voice_channels.values():
+            if channel.id not in seen:
+                seen.add(channel.id)
+                ret.append(channel)
+        return ret
+
     def __str__(self):
         return self.name
 
@@ -160,6 +215,11 @@ class Server(Hashable):
             ch_id = data.get('channel_id')
             channel = self.get_channel(ch_id)
             member._update_voice_state(voice_channel=channel, **data)
+            self._add_member(member)
+            if channel is None:
+                self._voice_channels.pop(user_id, None)
+            else:
+                self._voice_channels[user_id] = channel
         return before, member
 
     def _add_role(self, role):
@@ -177,6 +237,9 @@ class Server(Hashable):
         # this raises ValueError if it fails..
         self.roles.remove(role)
 
+        if isinstance(self._members, ColumnarMemberStore):
+            self._members.remove_role(role)
+
         # since it didn't, we can change the positions now
         # basically the same as above except we only decrement
         # the position if we're above the role we deleted.
@@ -220,7 +283,6 @@ class Server(Hashable):
 
         if 'owner_id' in guild:
             self.owner_id = guild['owner_id']
-            self.owner = self.get_member(self.owner_id)
 
         afk_id = guild.get('afk_channel_id')
         self.afk_channel = self.get_channel(afk_id)
@@ -243,6 +305,7 @@ class Server(Hashable):
                     pass
                 game = presence.get('game', {})
                 member.game = Game(**game) if game else None
+                self._add_member(member)
 
         if 'channels' in data:
             channels = data['channels']
@@ -261,6 +324,12 @@ class Server(Hashable):
         """Gets the default :class:`Channel` for the server."""
         return utils.find(lambda c: c.is_default, self.channels)
 
+    @property
+    def owner(self):
+        """Gets the :class:`Member` who owns the server. This is looked up on access,
+        so it is ``None`` while the owner is not cached yet."""
+        return self.get_member(self.owner_id)
+
     @property
     def icon_url(self):
         """Returns the URL version of the server's icon. Returns an empty string if it has no icon."""
@@ -321,6 +390,9 @@ class Server(Hashable):
             then ``None`` is returned.
         """
 
+        if isinstance(self._members, ColumnarMemberStore):
+            return self._members.get_named(name)
+
         result = None
         members = self.members
         if len(name) > 5 and name[-5] == '#':
@@ -36,6 +36,8 @@ from .role import Role
 from . import utils, compat
 from .enums import Status, ChannelType, try_enum
 from .calls import GroupCall
+from .raw_models import RawMessageDeleteEvent, RawBulkMessageDeleteEvent, RawMessageUpdateEvent, \
+                        RawReactionActionEvent, RawReactionClearEvent
 
 from collections import deque, namedtuple
 import copy, enum, math
@@ -51,9 +53,10 @@ log = logging.getLogger(__name__)
 ReadyState = namedtuple('ReadyState', ('launch', 'servers'))
 
 class ConnectionState:
-    def __init__(self, dispatch, chunker, syncer, max_messages, *, loop):
+    def __init__(self, dispatch, chunker, syncer, max_messages, *, loop, columnar_threshold=None):
         self.loop = loop
         self.max_messages = max_messages
+        self.columnar_threshold = columnar_threshold
         self.dispatch = dispatch
         self.chunker = chunker
         self.syncer = syncer
@@ -153,7 +156,9 @@ class ConnectionState:
         return utils.find(lambda m: m.id == msg_id, self.messages)
 
     def _add_server_from_data(self, guild):
-        server = Server(**guild)
+        threshold = self.columnar_threshold
+        columnar = threshold is not None and guild.get('member_count', 0) >= threshold
+        server = Server(columnar_members=columnar, **guild)
         Server.me = property(lambda s: s.get_member(self.user.id))
         Server.voice_client = property(lambda s: self._get_voice_client(s.id))
         self._add_server(server)
@@ -231,6 +236,7 @@ class ConnectionState:
         self.messages.append(message)
 
     def parse_message_delete(self, data):
+        self.dispatch('raw_message_delete', RawMessageDeleteEvent(data))
         message_id = data.get('id')
         found = self._get_message(message_id)
         if found is not None:
@@ -238,13 +244,16 @@ class ConnectionState:
             self.messages.remove(found)
 
     def parse_message_delete_bulk(self, data):
-        message_ids = set(data.get('ids', []))
+        raw = RawBulkMessageDeleteEvent(data)
+        self.dispatch('raw_bulk_message_delete', raw)
+        message_ids = raw.message_ids
         to_be_deleted = list(filter(lambda m: m.id in message_ids, self.messages))
         for msg in to_be_deleted:
             self.dispatch('message_delete', msg)
             self.messages.remove(msg)
 
     def parse_message_update(self, data):
+        self.dispatch('raw_message_edit', RawMessageUpdateEvent(data))
         message = self._get_message(data.get('id'))
         if message is not None:
             older_message = copy.copy(message)
@@ -260,9 +269,10 @@ class ConnectionState:
             self.dispatch('message_edit', older_message, message)
 
     def parse_message_reaction_add(self, data):
+        emoji = self._get_reaction_emoji(**data.pop('emoji'))
+        self.dispatch('raw_reaction_add', RawReactionActionEvent(data, emoji))
         message = self._get_message(data['message_id'])
         if message is not None:
-            emoji = self._get_reaction_emoji(**data.pop('emoji'))
             reaction = utils.get(message.reactions, emoji=emoji)
 
             is_me = data['user_id'] == self.user.id
@@ -282,16 +292,18 @@ class ConnectionState:
             self.dispatch('reaction_add', reaction, member)
 
     def parse_message_reaction_remove_all(self, data):
-        message =  self._get_message(data['message_id'])
+        self.dispatch('raw_reaction_clear', RawReactionClearEvent(data))
+        message = self._get_message(data['message_id'])
         if message is not None:
             old_reactions = message.reactions.copy()
             message.reactions.clear()
             self.dispatch('reaction_clear', message, old_reactions)
 
     def parse_message_reaction_remove(self, data):
+        emoji = self._get_reaction_emoji(**data['emoji'])
+        self.dispatch('raw_reaction_remove', RawReactionActionEvent(data, emoji))
         message = self._get_message(data['message_id'])
         if message is not None:
-            emoji = self._get_reaction_emoji(**data['emoji'])
             reaction = utils.get(message.reactions, emoji=emoji)
 
             # Eventual consistency means we can get out of order or duplicate removes.
@@ -340,6 +352,7 @@ class ConnectionState:
         member.name = user.get('username', member.name)
         member.avatar = user.get('avatar', member.avatar)
         member.discriminator = user.get('discriminator', member.discriminator)
+        server._add_member(member)
 
         self.dispatch('member_update', old_member, member)
 
@@ -428,15 +441,6 @@ class ConnectionState:
             if member is not None:
                 server._remove_member(member)
                 server._member_count -= 1
-
-                # remove them from the voice channel member list
-                vc = member.voice_channel
-                if vc is not None:
-                    try:
-                        vc.voice_members.remove(member)
-                    except:
-                        pass
-
                 self.dispatch('member_remove', member)
 
     def parse_guild_member_update(self, data):
@@ -464,6 +468,7 @@ class ConnectionState:
 
             # sort the roles by ID since they can be "randomised"
             member.roles.sort()
+            server._add_member(member)
             self.dispatch('member_update', old_member, member)
 
     def parse_guild_emojis_update(self, data):
@@ -576,7 +581,7 @@ class ConnectionState:
         server = self._get_server(data.get('guild_id'))
         if server is not None:
             user_id = data.get('user', {}).get('id')
-            member = utils.get(server.members, id=user_id)
+            member = server.get_member(user_id)
             if member is not None:
                 self.dispatch('member_ban', member)
 
@@ -625,10 +630,6 @@ class ConnectionState:
             if existing is None or existing.joined_at is None:
                 server._add_member(m)
 
-        # if the owner is offline, server.owner is potentially None
-        # therefore we should check if this chunk makes it point to a valid
-        # member.
-        server.owner = server.get_member(server.owner_id)
         log.info('processed a chunk for {} members.'.format(len(members)))
         self.process_listeners(ListenerType.chunk, server, len(members))
 
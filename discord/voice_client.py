@@ -44,7 +44,6 @@ import websockets
 import socket
 import json, time
 import logging
-import struct
 import threading
 import subprocess
 import shlex
@@ -55,13 +54,11 @@ import inspect
 
 log = logging.getLogger(__name__)
 
-try:
-    import nacl.secret
-    has_nacl = True
-except ImportError:
-    has_nacl = False
-
 from . import utils, opus
+from .voice_packet import VoicePacketBuilder, has_nacl
+from .voice_scheduler import VoiceProtocol, ScheduledPlayer, ScheduledProcessPlayer, \
+                             ScheduledOpusPlayer, ScheduledOpusProcessPlayer
+from .oggparse import OpusStream
 from .gateway import *
 from .errors import ClientException, InvalidArgument, ConnectionClosed
 
@@ -179,6 +176,44 @@ class ProcessPlayer(StreamPlayer):
         if self.process.poll() is None:
             self.process.communicate()
 
+class OpusStreamPlayer(StreamPlayer):
+    def __init__(self, stream, encoder, connected, player, after, **kwargs):
+        super().__init__(stream, encoder, connected, player, after, **kwargs)
+        self.packets = OpusStream(stream).iter_packets()
+        self._elapsed = 0.0
+
+    def _do_run(self):
+        self.loops = 0
+        self._start = time.time()
+        self._elapsed = 0.0
+        for packet in self.packets:
+            # are we paused?
+            if not self._resumed.is_set():
+                # wait until we aren't
+                self._resumed.wait()
+
+            if self._end.is_set():
+                break
+
+            if not self._connected.is_set():
+                break
+
+            self.loops += 1
+            samples = opus.packet_samples(packet)
+            self.player(packet, encode=False, samples=samples)
+            # packets don't have to be 20ms long, so keep time by their duration
+            self._elapsed += samples / 48000.0
+            delay = max(0, self._start + self._elapsed - time.time())
+            time.sleep(delay)
+
+        self.stop()
+
+    def resume(self):
+        self._elapsed = 0.0
+        super().resume()
+
+class OpusProcessPlayer(ProcessPlayer, OpusStreamPlayer):
+    pass
 
 class VoiceClient:
     """Represents a Discord voice connection.
@@ -211,8 +246,15 @@ class VoiceClient:
         Shorthand for ``channel.server``.
     loop
         The event loop that the voice client is running on.
+    scheduler : Optional[:class:`VoiceScheduler`]
+        The scheduler sending the audio of this connection's players, if the
+        client was created with the ``voice_scheduler`` option.
     """
-    def __init__(self, user, main_ws, session_id, channel, data, loop):
+
+    #: the number of bytes that may be waiting to be sent before packets are dropped
+    MAX_SEND_BUFFER = 65536
+
+    def __init__(self, user, main_ws, session_id, channel, data, loop, scheduler=None):
         if not has_nacl:
             raise RuntimeError("PyNaCl library needed in order to use voice")
 
@@ -225,8 +267,12 @@ class VoiceClient:
         self.token = data.get('token')
         self.guild_id = data.get('guild_id')
         self.endpoint = data.get('endpoint')
+        self.scheduler = scheduler
+        self._transport = None
+        self._transport_thread = None
         self.sequence = 0
         self.timestamp = 0
+        self._packet_builder = None
         self.encoder = opus.Encoder(48000, 2)
         log.info('created opus encoder with {0.__dict__}'.format(self.encoder))
 
@@ -264,6 +310,11 @@ class VoiceClient:
                 self._connected.set()
                 break
 
+        if self.scheduler is not None:
+            # the IP discovery is done, from here on the socket is only written to
+            self._transport, _ = yield from self.loop.create_datagram_endpoint(VoiceProtocol, sock=self.socket)
+            self._transport_thread = threading.get_ident()
+
         self.loop.create_task(self.poll_voice_ws())
 
     @asyncio.coroutine
@@ -297,7 +348,10 @@ class VoiceClient:
             yield from self.ws.close()
             yield from self.main_ws.voice_state(self.guild_id, None, self_mute=True)
         finally:
-            self.socket.close()
+            if self._transport is not None:
+                self._transport.close()
+            else:
+                self.socket.close()
 
     @asyncio.coroutine
     def move_to(self, channel):
@@ -331,25 +385,15 @@ class VoiceClient:
 
     # audio related
 
-    def _get_voice_packet(self, data):
-        header = bytearray(12)
-        nonce = bytearray(24)
-        box = nacl.secret.SecretBox(bytes(self.secret_key))
-
-        # Formulate header
-        header[0] = 0x80
-        header[1] = 0x78
-        struct.pack_into('>H', header, 2, self.sequence)
-        struct.pack_into('>I', header, 4, self.timestamp)
-        struct.pack_into('>I', header, 8, self.ssrc)
-
-        # Copy header to nonce's first 12 bytes
-        nonce[:12] = header
+    def _get_packet_builder(self):
+        builder = self._packet_builder
+        if builder is None or builder.secret_key is not self.secret_key:
+            # a new session key, carry on from where the previous session left off
+            builder = VoicePacketBuilder(self.secret_key, self.ssrc, sequence=self.sequence, timestamp=self.timestamp)
+            self._packet_builder = builder
+        return builder
 
-        # Encrypt and return the data
-        return header + box.encrypt(bytes(data), bytes(nonce)).ciphertext
-
-    def create_ffmpeg_player(self, filename, *, use_avconv=False, pipe=False, stderr=None, options=None, before_options=None, headers=None, after=None):
+    def create_ffmpeg_player(self, filename, *, use_avconv=False, pipe=False, stderr=None, options=None, before_options=None, headers=None, after=None, passthrough=False):
         """Creates a stream player for ffmpeg that launches in a separate thread to play
         audio.
 
@@ -394,6 +438,12 @@ class VoiceClient:
         after : callable
             The finalizer that is called after the stream is done being
             played. All exceptions the finalizer throws are silently discarded.
+        passthrough : bool
+            If true, the audio of an Opus source (such as an Opus WebM or Ogg
+            file) is copied into an Ogg stream without being decoded and its
+            packets are sent as they are. This takes a fraction of the CPU
+            time of decoding and encoding, but only works for Opus sources and
+            the player's ``volume`` has no effect. See :meth:`create_opus_player`.
 
         Raises
         -------
@@ -417,8 +467,12 @@ class VoiceClient:
         if isinstance(before_options, str):
             before_args += ' ' + before_options
 
-        cmd = command + '{} -i {} -f s16le -ar {} -ac {} -loglevel warning'
-        cmd = cmd.format(before_args, input_name, self.encoder.sampling_rate, self.encoder.channels)
+        if passthrough:
+            cmd = command + '{} -i {} -map 0:a:0 -c:a copy -f ogg -loglevel warning'
+            cmd = cmd.format(before_args, input_name)
+        else:
+            cmd = command + '{} -i {} -f s16le -ar {} -ac {} -loglevel warning'
+            cmd = cmd.format(before_args, input_name, self.encoder.sampling_rate, self.encoder.channels)
 
         if isinstance(options, str):
             cmd = cmd + ' ' + options
@@ -429,6 +483,12 @@ class VoiceClient:
         args = shlex.split(cmd)
         try:
             p = subprocess.Popen(args, stdin=stdin, stdout=subprocess.PIPE, stderr=stderr)
+            if passthrough:
+                if self.scheduler is not None:
+                    return ScheduledOpusProcessPlayer(p, self, self.scheduler, after)
+                return OpusProcessPlayer(p, self, after)
+            if self.scheduler is not None:
+                return ScheduledProcessPlayer(p, self, self.scheduler, after)
             return ProcessPlayer(p, self, after)
         except FileNotFoundError as e:
             raise ClientException('ffmpeg/avconv was not found in your PATH environment variable') from e
@@ -506,7 +566,9 @@ class VoiceClient:
             See `the documentation <ytdl>`_ for more details.
         \*\*kwargs
             The rest of the keyword arguments are forwarded to
-            :func:`create_ffmpeg_player`.
+            :func:`create_ffmpeg_player`. If ``passthrough`` is true, only
+            Opus audio formats are requested from youtube-dl unless
+            ``ytdl_options`` chooses a format.
 
         Raises
         -------
@@ -527,6 +589,9 @@ class VoiceClient:
             'prefer_ffmpeg': not use_avconv
         }
 
+        if kwargs.get('passthrough', False):
+            opts['format'] = 'bestaudio[acodec=opus]'
+
         if ytdl_options is not None and isinstance(ytdl_options, dict):
             opts.update(ytdl_options)
 
@@ -644,6 +709,11 @@ class VoiceClient:
         via  ``player.error``\. When the player is stopped in this matter, the
         finalizer under ``after`` is called.
 
+        If the client was created with the ``voice_scheduler`` option, a
+        :class:`ScheduledPlayer` is returned instead. It supports the same
+        operations but doesn't start a thread of its own and calls ``after``
+        from the event loop.
+
         Parameters
         -----------
         stream
@@ -659,9 +729,50 @@ class VoiceClient:
         StreamPlayer
             A stream player with the operations noted above.
         """
+        if self.scheduler is not None:
+            return ScheduledPlayer(stream, self, self.scheduler, after)
         return StreamPlayer(stream, self.encoder, self._connected, self.play_audio, after)
 
-    def play_audio(self, data, *, encode=True):
+    def create_opus_player(self, stream, *, after=None):
+        """Creates a stream player that plays an Ogg Opus stream without
+        decoding it.
+
+        The Opus packets are read from the stream and sent as they are, so no
+        CPU time is spent on decoding and encoding the audio. Files in other
+        containers, such as Opus WebM, can be played this way through
+        :meth:`create_ffmpeg_player` with ``passthrough`` set, which copies
+        the audio into an Ogg stream.
+
+        The operations that can be done on the player are the same as those in
+        :meth:`create_stream_player`, except that ``player.volume`` has no effect.
+        The encoder options are not used either, the stream is sent with the
+        sampling rate and channels it was encoded with.
+
+        Parameters
+        -----------
+        stream
+            The file-like object, opened in binary mode, to read the Ogg Opus
+            stream from.
+        after
+            The finalizer that is called after the stream is exhausted.
+            See :meth:`create_stream_player`.
+
+        Raises
+        -------
+        OggError
+            The stream is not a valid Ogg Opus stream. This is raised when the
+            player runs and is then available through ``player.error``.
+
+        Returns
+        --------
+        StreamPlayer
+            A stream player with the operations noted above.
+        """
+        if self.scheduler is not None:
+            return ScheduledOpusPlayer(stream, self, self.scheduler, after)
+        return OpusStreamPlayer(stream, self.encoder, self._connected, self.play_audio, after)
+
+    def play_audio(self, data, *, encode=True, samples=None):
         """Sends an audio packet composed of the data.
 
         You must be connected to play audio.
@@ -672,6 +783,10 @@ class VoiceClient:
             The *bytes-like object* denoting PCM or Opus voice data.
         encode : bool
             Indicates if ``data`` should be encoded into Opus.
+        samples : int
+            The number of samples per channel ``data`` holds. Defaults to
+            the encoder's samples per frame. When passing Opus packets of
+            other lengths, this is :func:`opus.packet_samples` of the packet.
 
         Raises
         -------
@@ -681,15 +796,35 @@ class VoiceClient:
             Encoding the data failed.
         """
 
-        self.checked_add('sequence', 1, 65535)
+        builder = self._get_packet_builder()
+        if samples is None:
+            samples = self.encoder.samples_per_frame
         if encode:
-            encoded_data = self.encoder.encode(data, self.encoder.samples_per_frame)
+            encoded_data = self.encoder.encode(data, samples)
         else:
             encoded_data = data
-        packet = self._get_voice_packet(encoded_data)
-        try:
-            sent = self.socket.sendto(packet, (self.endpoint_ip, self.voice_port))
-        except BlockingIOError:
+        packet = builder.build(encoded_data, samples)
+        self.sequence = builder.sequence
+        if not self._send_packet(packet):
             log.warning('A packet has been dropped (seq: {0.sequence}, timestamp: {0.timestamp})'.format(self))
 
-        self.checked_add('timestamp', self.encoder.samples_per_frame, 4294967295)
+        self.timestamp = builder.timestamp
+
+    def _send_packet(self, packet):
+        transport = self._transport
+        if transport is None or threading.get_ident() != self._transport_thread:
+            # transports aren't thread-safe, so players running in their
+            # own thread keep writing to the socket directly
+            try:
+                self.socket.sendto(packet, (self.endpoint_ip, self.voice_port))
+            except BlockingIOError:
+                return False
+            return True
+
+        # the transport queues what the socket can't take right away,
+        # don't let it fall behind by more than a fraction of a second
+        if transport.get_write_buffer_size() > self.MAX_SEND_BUFFER:
+            return False
+
+        transport.sendto(packet, (self.endpoint_ip, self.voice_port))
+        return True
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-2016 Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import struct
+import sys
+import time
+
+try:
+    import nacl.secret
+    import nacl.bindings
+    has_nacl = True
+except ImportError:
+    has_nacl = False
+
+_pack_sequence_timestamp = struct.Struct('>HI').pack_into
+
+class VoicePacketBuilder:
+    """Builds the encrypted RTP packets of a voice connection.
+
+    Everything that stays the same for the lifetime of a voice session is
+    prepared once: the encryption key, the RTP header with the SSRC and the
+    nonce buffer. Building a packet then only writes the sequence number
+    and timestamp into the header and encrypts the audio data.
+
+    The sequence number and timestamp wrap around at 16 and 32 bits as RTP
+    requires.
+
+    Attributes
+    -----------
+    secret_key
+        The secret key the builder was created with.
+    ssrc : int
+        The synchronisation source of the connection.
+    sequence : int
+        The sequence number of the last packet, the next one gets the
+        number after it.
+    timestamp : int
+        The RTP timestamp of the next packet.
+    """
+
+    __slots__ = ['secret_key', 'ssrc', 'sequence', 'timestamp', '_key', '_header', '_nonce']
+
+    def __init__(self, secret_key, ssrc, *, sequence=0, timestamp=0):
+        self.secret_key = secret_key
+        self.ssrc = ssrc
+        self.sequence = sequence
+        self.timestamp = timestamp
+        # SecretBox.encrypt returns the nonce and ciphertext glued together,
+        # only for us to cut the nonce off again, so encrypt with the key directly
+        self._key = bytes(secret_key)
+        if len(self._key) != nacl.secret.SecretBox.KEY_SIZE:
+            raise ValueError('The secret key must be exactly {} bytes long'.format(nacl.secret.SecretBox.KEY_SIZE))
+
+        self._header = header = bytearray(12)
+        header[0] = 0x80
+        header[1] = 0x78
+        struct.pack_into('>I', header, 8, ssrc)
+        # the last 12 bytes of the nonce are always zero
+        self._nonce = bytearray(24)
+
+    def build(self, data, samples):
+        """Returns the packet for ``data`` and advances the sequence number
+        and the timestamp, the latter by ``samples``."""
+        header = self._header
+        self.sequence = sequence = (self.sequence + 1) & 0xFFFF
+        _pack_sequence_timestamp(header, 2, sequence, self.timestamp)
+        self.timestamp = (self.timestamp + samples) & 0xFFFFFFFF
+
+        nonce = self._nonce
+        nonce[:12] = header
+        if not isinstance(data, bytes):
+            data = bytes(data)
+
+        return header + nacl.bindings.crypto_secretbox(data, bytes(nonce), self._key)
+
+def _legacy_packet(secret_key, ssrc, sequence, timestamp, data):
+    # the packet building this replaces, kept for the benchmark
+    header = bytearray(12)
+    nonce = bytearray(24)
+    box = nacl.secret.SecretBox(bytes(secret_key))
+    header[0] = 0x80
+    header[1] = 0x78
+    struct.pack_into('>H', header, 2, sequence)
+    struct.pack_into('>I', header, 4, timestamp)
+    struct.pack_into('>I', header, 8, ssrc)
+    nonce[:12] = header
+    return header + box.encrypt(bytes(data), bytes(nonce)).ciphertext
+
+def benchmark(duration=2.0, payload=160):
+    """Returns the packets built per second on one core by the legacy path
+    and by :class:`VoicePacketBuilder`, as a ``(legacy, builder)`` tuple."""
+    key = list(range(32))
+    data = bytes(payload)
+    ssrc = 0x1234
+
+    def run(build):
+        count = 0
+        end = time.perf_counter() + duration
+        while time.perf_counter() < end:
+            for _ in range(1000):
+                build()
+            count += 1000
+        return count / duration
+
+    sequence = [0]
+    def legacy():
+        sequence[0] = (sequence[0] + 1) & 0xFFFF
+        _legacy_packet(key, ssrc, sequence[0], sequence[0] * 960, data)
+
+    builder = VoicePacketBuilder(key, ssrc)
+    return run(legacy), run(lambda: builder.build(data, 960))
+
+if __name__ == '__main__':
+    if not has_nacl:
+        print('PyNaCl is required for the benchmark.', file=sys.stderr)
+        sys.exit(1)
+
+    legacy, builder = benchmark()
+    print('legacy:  {:,.0f} packets/s'.format(legacy))
+    print('builder: {:,.0f} packets/s ({:.1f}x)'.format(builder, builder / legacy))
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-2016 Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import audioop
+import concurrent.futures
+import inspect
+import logging
+from collections import deque
+
+from .oggparse import OpusStream
+from .opus import packet_samples
+
+log = logging.getLogger(__name__)
+
+class VoiceProtocol(asyncio.DatagramProtocol):
+    """The datagram protocol of a voice connection's UDP socket.
+
+    Only sending is supported, received datagrams are discarded.
+    """
+
+    def __init__(self):
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        pass
+
+    def error_received(self, exc):
+        log.warning('voice socket error: {}'.format(exc))
+
+    def connection_lost(self, exc):
+        self.transport = None
+
+class VoiceScheduler:
+    """Sends the audio of every scheduled player from the event loop.
+
+    A single timer on the event loop fires every frame (20 ms) and sends the
+    next frame of every playing :class:`ScheduledPlayer`. Reading from the
+    players' streams and encoding to Opus is done ahead of time by a fixed
+    number of worker threads, so the number of threads does not grow with the
+    number of voice connections.
+
+    The workers are shared by all players. A read that blocks, such as one
+    waiting on a live stream that only delivers audio in real time, holds
+    a worker for as long as it blocks. Once every worker is held that way
+    the other players can't be read ahead of time and fall silent, so there
+    should be at least one worker more than the number of such streams that
+    play at the same time.
+
+    The ticks are scheduled against absolute deadlines so they don't drift.
+    If the event loop was blocked for a while the missed frames are not
+    sent in a burst, the schedule starts over instead.
+
+    This is created by :class:`Client` when the ``voice_scheduler`` option
+    is set.
+
+    Attributes
+    -----------
+    loop
+        The event loop the frames are sent from.
+    executor : concurrent.futures.ThreadPoolExecutor
+        The worker threads reading and encoding the audio.
+    late_ticks : int
+        The number of times the schedule had to be reset because the event
+        loop fell behind.
+    """
+
+    #: the number of frames the event loop may fall behind before the schedule is reset
+    MAX_LAG = 5
+
+    def __init__(self, *, loop, workers=2, frame_length=20):
+        self.loop = loop
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        self.delay = frame_length / 1000.0
+        self.late_ticks = 0
+        self._players = []
+        self._handle = None
+        self._next = None
+
+    @property
+    def players(self):
+        """List[:class:`ScheduledPlayer`]: The players currently scheduled."""
+        return list(self._players)
+
+    def add(self, player):
+        if player in self._players:
+            return
+
+        self._players.append(player)
+        if self._handle is None:
+            self._next = self.loop.time()
+            self._handle = self.loop.call_at(self._next, self._tick)
+
+    def remove(self, player):
+        try:
+            self._players.remove(player)
+        except ValueError:
+            return
+
+        if not self._players and self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _tick(self):
+        self._handle = None
+        self._next += self.delay
+        now = self.loop.time()
+        if now - self._next > self.delay * self.MAX_LAG:
+            self.late_ticks += 1
+            self._next = now + self.delay
+
+        for player in list(self._players):
+            try:
+                player._tick()
+            except Exception as e:
+                player._fail(e)
+
+        if self._players:
+            self._handle = self.loop.call_at(self._next, self._tick)
+
+    def close(self):
+        """Stops every scheduled player and shuts down the worker threads."""
+        for player in list(self._players):
+            player.stop()
+
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        self.executor.shutdown(wait=False)
+
+class ScheduledPlayer:
+    """A stream player that is driven by a :class:`VoiceScheduler`.
+
+    It supports the same operations as the threaded stream player, see
+    :meth:`VoiceClient.create_stream_player`. Unlike it, the ``after``
+    finalizer is called from the event loop.
+
+    Attributes
+    -----------
+    buffer_frames : int
+        The number of encoded frames kept ready ahead of the scheduler.
+    underruns : int
+        The number of ticks at which no frame was ready in time.
+    """
+
+    buffer_frames = 5
+
+    def __init__(self, stream, client, scheduler, after):
+        if after is not None and not callable(after):
+            raise TypeError('Expected a callable for the "after" parameter.')
+
+        self.buff = stream
+        self.encoder = client.encoder
+        self.frame_size = client.encoder.frame_size
+        self.player = client.play_audio
+        self.after = after
+        self.loops = 0
+        self.underruns = 0
+        self._connected = client._connected
+        self._scheduler = scheduler
+        self._loop = scheduler.loop
+        # frames are (data, samples, duration), the duration in 48 kHz samples
+        self._frames = deque()
+        self._tick_duration = round(scheduler.delay * 48000)
+        self._credit = 0
+        self._pending = None
+        self._eof = False
+        self._paused = False
+        self._end = False
+        self._volume = 1.0
+        self._current_error = None
+
+    def start(self):
+        if self._end:
+            raise RuntimeError('players can only be started once')
+        self._fill()
+        self._scheduler.add(self)
+
+    def _read_frame(self):
+        # called from a worker thread, returns None at the end of the stream
+        data = self.buff.read(self.frame_size)
+
+        if self._volume != 1.0:
+            data = audioop.mul(data, 2, min(self._volume, 2.0))
+
+        if len(data) != self.frame_size:
+            return None
+
+        encoder = self.encoder
+        return encoder.encode(data, encoder.samples_per_frame), encoder.samples_per_frame, encoder.frame_length * 48
+
+    def _read_frames(self, count):
+        frames = []
+        for _ in range(count):
+            if self._end:
+                break
+
+            frame = self._read_frame()
+            if frame is None:
+                return frames, True
+            frames.append(frame)
+        return frames, False
+
+    def _fill(self):
+        if self._pending is not None or self._eof or self._end:
+            return
+
+        count = self.buffer_frames - len(self._frames)
+        self._pending = self._loop.run_in_executor(self._scheduler.executor, self._read_frames, count)
+        self._pending.add_done_callback(self._frames_read)
+
+    def _frames_read(self, fut):
+        self._pending = None
+        if self._end:
+            self._cleanup()
+            return
+
+        try:
+            frames, self._eof = fut.result()
+        except Exception as e:
+            self._fail(e)
+        else:
+            self._frames.extend(frames)
+
+    def _tick(self):
+        if not self._connected.is_set():
+            self.stop()
+            return
+
+        if self._paused:
+            return
+
+        # send as many frames as fit into the tick, a frame longer than a
+        # tick is paid back by skipping the following ticks
+        frames = self._frames
+        self._credit += self._tick_duration
+        while self._credit > 0 and frames:
+            data, samples, duration = frames.popleft()
+            self.loops += 1
+            self.player(data, encode=False, samples=samples)
+            self._credit -= duration
+
+        if self._credit > 0:
+            # ran dry, don't try to make up for it later
+            self._credit = 0
+            if self._eof:
+                self.stop()
+                return
+            elif self.loops:
+                self.underruns += 1
+
+        # refill once half of the buffer has been played
+        if len(self._frames) <= self.buffer_frames // 2:
+            self._fill()
+
+    def _fail(self, error):
+        self._current_error = error
+        self.stop()
+
+    def stop(self):
+        if self._end:
+            return
+
+        self._end = True
+        self._frames.clear()
+        self._scheduler.remove(self)
+        if self._pending is None:
+            self._cleanup()
+        # otherwise a worker is still reading the stream, clean up when it's done
+
+    def _cleanup(self):
+        self._call_after()
+
+    def _call_after(self):
+        if self.after is not None:
+            try:
+                arg_count = len(inspect.signature(self.after).parameters)
+            except:
+                # if this ended up happening, a mistake was made.
+                arg_count = 0
+
+            try:
+                if arg_count == 0:
+                    self.after()
+                else:
+                    self.after(self)
+            except:
+                pass
+
+    @property
+    def error(self):
+        return self._current_error
+
+    @property
+    def volume(self):
+        return self._volume
+
+    @volume.setter
+    def volume(self, value):
+        self._volume = max(value, 0.0)
+
+    def pause(self):
+        self._paused = True
+
+    def resume(self):
+        self._paused = False
+
+    def is_playing(self):
+        return not self._paused and not self.is_done()
+
+    def is_done(self):
+        return not self._connected.is_set() or self._end
+
+class ScheduledOpusPlayer(ScheduledPlayer):
+    """A :class:`ScheduledPlayer` that sends the packets of an Ogg Opus
+    stream without decoding or encoding them.
+
+    The volume can't be changed without decoding, so it is ignored.
+    """
+
+    def __init__(self, stream, client, scheduler, after):
+        super().__init__(stream, client, scheduler, after)
+        self.packets = OpusStream(stream).iter_packets()
+
+    def _read_frame(self):
+        packet = next(self.packets, None)
+        if packet is None:
+            return None
+
+        samples = packet_samples(packet)
+        return packet, samples, samples
+
+class ScheduledProcessPlayer(ScheduledPlayer):
+    def __init__(self, process, client, scheduler, after):
+        super().__init__(process.stdout, client, scheduler, after)
+        self.process = process
+
+    def _kill(self):
+        self.process.kill()
+        if self.process.poll() is None:
+            self.process.communicate()
+
+    def _cleanup(self):
+        # reaping the process can block, so it's done by a worker as well
+        try:
+            fut = self._loop.run_in_executor(self._scheduler.executor, self._kill)
+        except RuntimeError:
+            # the scheduler has been closed
+            self._kill()
+            self._call_after()
+        else:
+            fut.add_done_callback(lambda f: self._call_after())
+
+class ScheduledOpusProcessPlayer(ScheduledProcessPlayer, ScheduledOpusPlayer):
+    pass